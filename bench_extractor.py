@@ -0,0 +1,215 @@
+"""
+Extractor benchmark: synthetic master workbooks + the real files in EXPERIMENT DATA.
+
+Generates workbooks in the Master Template / HPS DAILY / LTO DAILY / ISV layouts,
+scaled in days on stream and in extra (unmatched) label rows, then times
+extract_from_file per stage (ExtractProfile) and peak Python memory (tracemalloc)
+for each backend. Record counts are checked against what the generator wrote and
+against the known counts of the real workbooks.
+
+Results are appended to a JSON file; each run is compared with the previous one.
+
+Usage:  python bench_extractor.py [--days 28 100 365] [--extra-rows 0 500] [--repeat 3]
+"""
+import argparse
+import datetime as dt
+import json
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import openpyxl
+
+from utils.extractor import (extract_from_file, ExtractProfile, BACKENDS, SHEET_CATALOGUES, GAS_SHEET,
+                             GAS_SECTIONS, GAS_WINDOW)
+
+DATA_DIR = Path(__file__).parent / "EXPERIMENT DATA"
+RESULTS_PATH = Path(__file__).parent / "bench_results.json"
+
+# Record counts of the real workbooks (pandas and openpyxl backends must agree).
+REAL_COUNTS = {
+    "01_Master": 173,
+    "02_Master": 1008,
+    "03_Master": 1097,
+    "04_Master": 0,
+}
+
+FIRST_DAY_COL = 5
+MAX_DAY = 100          # the extractor only accepts day-on-stream values 1..100
+REGRESSION_PCT = 20.0  # flag cases that got this much slower than the previous run
+
+
+# ── Synthetic workbook generator ──────────────────────────────────────────────
+
+def _label_col(sheet_name):
+    return 2 if sheet_name == "Master Template" else 3
+
+def _row(cells, width):
+    out = [None] * width
+    for c, v in cells.items(): out[c] = v
+    return out
+
+def _kept(info, col, day):
+    """Mirror of the extractor's keep rules for a filled, non-zero cell."""
+    fixed = info[5] if len(info) > 5 else None
+    return day <= MAX_DAY and (not fixed or fixed[0] <= col <= fixed[1])
+
+def _param_rows(catalogue, label_col, days, width, rng, fill):
+    rows, expected = [], 0
+    for key, info in catalogue.items():
+        cells = {label_col: info[0][0]}
+        for d in range(1, days + 1):
+            col = FIRST_DAY_COL + d - 1
+            if rng.random() < fill:
+                cells[col] = round(rng.uniform(0.1, 100.0), 4)
+                expected += _kept(info, col, d)
+        rows.append(_row(cells, width))
+    return rows, expected
+
+def make_workbook(path, days=28, extra_rows=0, fill=0.8, seed=0):
+    """Write a synthetic master workbook. Returns the number of records the extractor should find."""
+    rng = random.Random(seed)
+    width = FIRST_DAY_COL + days
+    start = dt.datetime(2025, 1, 1)
+    wb = openpyxl.Workbook(write_only=True)
+    expected = 0
+    for name, catalogue in SHEET_CATALOGUES.items():
+        ws = wb.create_sheet(name)
+        lc = _label_col(name)
+        day_cells = {FIRST_DAY_COL + d - 1: d for d in range(1, days + 1)}
+        op_cells = {FIRST_DAY_COL + d - 1: start + dt.timedelta(days=d - 1) for d in range(1, days + 1)}
+        lab_cells = {FIRST_DAY_COL + d - 1: start + dt.timedelta(days=d) for d in range(1, days + 1)}
+        header = [_row({1: f"MEBU synthetic — {name}"}, width), _row({}, width), _row({}, width),
+                  _row({lc: "Pilot Plant Operation--->", **op_cells}, width),
+                  _row({lc: "Lab Date-->", **lab_cells}, width),
+                  _row({lc: "Day on stream-->", **day_cells}, width),
+                  _row({}, width), _row({}, width)]
+        for row in header: ws.append(row)
+
+        rows, n = _param_rows(catalogue, lc, days, width, rng, fill)
+        expected += n
+        for row in rows: ws.append(row)
+        for i in range(extra_rows):
+            ws.append(_row({lc: f"Filler row {i}", FIRST_DAY_COL: rng.uniform(0.1, 100.0)}, width))
+
+        if name == GAS_SHEET:
+            for _, _, title, gas_catalogue in GAS_SECTIONS:
+                ws.append(_row({}, width))
+                ws.append(_row({1: title}, width))
+                rows, n = _param_rows(gas_catalogue, 3, days, width, rng, fill)
+                expected += n
+                for row in rows: ws.append(row)
+                for _ in range(GAS_WINDOW - len(rows)): ws.append(_row({}, width))
+    wb.save(path)
+    return expected
+
+
+# ── Measurement ───────────────────────────────────────────────────────────────
+
+def measure(path, backend, repeat=1):
+    """Best-of-repeat wall time, stage breakdown of that run, and peak traced memory."""
+    best = None
+    for _ in range(repeat):
+        profile = ExtractProfile()
+        t0 = time.perf_counter()
+        records, _ = extract_from_file(str(path), exp_id=0, backend=backend, profile=profile)
+        elapsed = time.perf_counter() - t0
+        if best is None or elapsed < best[0]:
+            best = (elapsed, profile, len(records))
+    elapsed, profile, n = best
+
+    tracemalloc.start()
+    extract_from_file(str(path), exp_id=0, backend=backend)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "seconds": round(elapsed, 4),
+        "stages": {k: round(v, 4) for k, v in profile.stage_totals().items()},
+        "records": n,
+        "peak_mb": round(peak / 2**20, 2),
+    }
+
+def bench_synthetic(days_list, extra_rows_list, repeat):
+    cases = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for days in days_list:
+            for extra in extra_rows_list:
+                path = Path(tmp) / f"synthetic_{days}d_{extra}r.xlsx"
+                expected = make_workbook(path, days=days, extra_rows=extra)
+                for backend in BACKENDS:
+                    m = measure(path, backend, repeat)
+                    m.update(case=f"synthetic {days}d +{extra} rows", backend=backend,
+                             expected=expected, parity=m["records"] == expected)
+                    cases.append(m)
+    return cases
+
+def bench_real(repeat):
+    cases = []
+    for f in sorted(DATA_DIR.glob("*.xlsx")):
+        expected = next((n for prefix, n in REAL_COUNTS.items() if f.name.startswith(prefix)), None)
+        for backend in BACKENDS:
+            m = measure(f, backend, repeat)
+            m.update(case=f.name, backend=backend, expected=expected,
+                     parity=expected is None or m["records"] == expected)
+            cases.append(m)
+    return cases
+
+
+# ── Reporting ─────────────────────────────────────────────────────────────────
+
+def _load_runs(path):
+    try:
+        return json.loads(Path(path).read_text())
+    except (OSError, ValueError):
+        return []
+
+def report(cases, previous=None):
+    prev = {(c["case"], c["backend"]): c for c in (previous or {}).get("cases", [])}
+    regressions = []
+    print(f"{'case':<48} {'backend':<9} {'records':>8} {'seconds':>8} {'peak MB':>8}  top stages")
+    for c in cases:
+        top = ", ".join(f"{k} {v:.3f}" for k, v in list(c["stages"].items())[:3])
+        flag = "" if c["parity"] else f"  PARITY FAIL (expected {c['expected']})"
+        old = prev.get((c["case"], c["backend"]))
+        if old and old["seconds"] > 0:
+            change = 100.0 * (c["seconds"] - old["seconds"]) / old["seconds"]
+            flag += f"  {change:+.0f}%"
+            if change > REGRESSION_PCT: regressions.append(c)
+        print(f"{c['case'][:48]:<48} {c['backend']:<9} {c['records']:>8} {c['seconds']:>8.3f} "
+              f"{c['peak_mb']:>8.1f}  {top}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Excel extractor.")
+    parser.add_argument("--days", type=int, nargs="+", default=[28, 100, 365])
+    parser.add_argument("--extra-rows", type=int, nargs="+", default=[0, 500])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--out", default=str(RESULTS_PATH), help="JSON file the run is appended to")
+    parser.add_argument("--no-real", action="store_true", help="skip the EXPERIMENT DATA files")
+    args = parser.parse_args()
+
+    cases = bench_synthetic(args.days, args.extra_rows, args.repeat)
+    if not args.no_real:
+        cases += bench_real(args.repeat)
+
+    runs = _load_runs(args.out)
+    regressions = report(cases, runs[-1] if runs else None)
+    runs.append({"timestamp": dt.datetime.now().isoformat(timespec="seconds"),
+                 "python": platform.python_version(), "cases": cases})
+    Path(args.out).write_text(json.dumps(runs, indent=1))
+
+    failures = [c for c in cases if not c["parity"]]
+    print(f"\n{len(cases)} cases, {len(failures)} parity failures, "
+          f"{len(regressions)} slower than {REGRESSION_PCT:.0f}% vs previous run -> {args.out}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -50,6 +50,17 @@ def open_browser_delayed(seconds=4):
     webbrowser.open(URL)
 
 
+def start_auto_ingest():
+    """Start the EXPERIMENT DATA watcher on a background thread; the app still starts if it cannot."""
+    if BASE_DIR not in sys.path:
+        sys.path.insert(0, BASE_DIR)
+    try:
+        from utils.watcher import start_watcher
+        start_watcher()
+    except Exception as e:
+        print(f"Auto-ingest watcher not started: {e}")
+
+
 def show_error(msg):
     """Show a simple error dialog using PowerShell (no tkinter dependency)."""
     subprocess.run(
@@ -82,6 +93,9 @@ def main():
     t = threading.Thread(target=open_browser_delayed, args=(4,), daemon=True)
     t.start()
 
+    # Auto-ingest workbooks dropped into EXPERIMENT DATA (runs outside Streamlit)
+    start_auto_ingest()
+
     # Launch streamlit — this blocks until the user closes the server
     subprocess.run(
         [streamlit_exe, 'run', MAIN_PY,
@@ -8,7 +8,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 
 import streamlit as st
-from utils.db import init_db, get_all_experiments, get_measurement_count
+from utils.db import init_db, get_experiment_summaries
 from utils.styles import inject_css, page_header
 
 st.set_page_config(
@@ -27,8 +27,8 @@ st.markdown(page_header(
     subtitle="Residue Hydrocracking Pilot Plant — Experiment Data Management",
 ), unsafe_allow_html=True)
 
-experiments = get_all_experiments()
-total_measurements = sum(get_measurement_count(e["id"]) for e in experiments)
+experiments = get_experiment_summaries()
+total_measurements = sum(e["n_records"] for e in experiments)
 
 col1, col2, col3, col4 = st.columns(4)
 col1.metric("Experiments Loaded", len(experiments))
@@ -118,43 +118,14 @@ if experiments:
     st.markdown("<hr>", unsafe_allow_html=True)
     st.markdown("### Loaded Experiments")
     import pandas as pd
-    from utils.db import get_phases
-    sorted_exps = sorted(experiments, key=lambda e: e["exp_name"])
-    rows = []
-    for idx, e in enumerate(sorted_exps, start=1):
-        phases = get_phases(e["id"])
-        feed_names = []
-        for p in phases:
-            fn = p.get("feed_name")
-            if fn and fn not in feed_names:
-                feed_names.append(fn)
-        vr_str = ", ".join(feed_names) if feed_names else "—"
-        if phases:
-            temp_parts = []
-            all_default = all(p.get("phase_name", "Default") == "Default" for p in phases)
-            for p in phases:
-                t = f"{p.get('rx1_temp',0):.0f}/{p.get('rx2_temp',0):.0f}/{p.get('rx3_temp',0):.0f}"
-                if all_default:
-                    temp_parts.append(t)
-                else:
-                    label = p.get("phase_name") or "Phase"
-                    temp_parts.append(f"{label}: {t}")
-            # Deduplicate identical temp strings
-            seen = []
-            for t in temp_parts:
-                if t not in seen:
-                    seen.append(t)
-            temp_str = " | ".join(seen)
-        else:
-            temp_str = "—"
-        rows.append({
-            "No": idx,
-            "Experiment Name": e["exp_name"],
-            "Start Date": e.get("start_date") or "—",
-            "VR Feed": vr_str,
-            "Phases": len(phases),
-            "Temperature (Rx1/Rx2/Rx3)": temp_str,
-            "Records": get_measurement_count(e["id"]),
-        })
+    rows = [{
+        "No": idx,
+        "Experiment Name": e["exp_name"],
+        "Start Date": e.get("start_date") or "—",
+        "VR Feed": ", ".join(e["feed_names"]) or "—",
+        "Phases": e["n_phases"],
+        "Temperature (Rx1/Rx2/Rx3)": " | ".join(e["temperatures"]) or "—",
+        "Records": e["n_records"],
+    } for idx, e in enumerate(experiments, start=1)]
     st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
 
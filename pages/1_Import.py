@@ -5,15 +5,17 @@ Load Excel experiment files into SQLite, configure metadata and VR blend.
 import streamlit as st
 import os
 import glob
-import json
 import pandas as pd
 from pathlib import Path
 import sys
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from utils.db import init_db, upsert_experiment, bulk_insert_measurements, get_all_experiments, get_measurement_count
-from utils.extractor import extract_from_file
+from utils.db import (init_db, upsert_experiment, get_ingest_log,
+                      get_experiment_summaries, read_cache_stats)
+from utils.importer import (DATA_DIR, MANIFEST_NAME, bulk_import, import_workbook,
+                            import_incremental, workbook_statuses)
+from utils.extractor import ExtractProfile
 from utils.styles import inject_css, page_header, glass_card, section_label
 
 init_db()
@@ -37,8 +39,6 @@ label[data-testid="stWidgetLabel"] > div > p {
 </style>
 """, unsafe_allow_html=True)
 
-DATA_DIR = Path(__file__).parent.parent / "EXPERIMENT DATA"
-
 st.markdown(page_header(
     "Import Experiment Data",
     subtitle="Load an Excel experiment file into the database and configure its metadata.",
@@ -52,12 +52,20 @@ if not excel_files:
     st.stop()
 
 file_names = [os.path.basename(f) for f in excel_files]
+file_status = workbook_statuses()
+STATUS_ICON = {"new": "🆕 new", "changed": "✏️ changed", "up to date": "✅ up to date"}
 
 col_sel, col_info = st.columns([3, 2])
 with col_sel:
     st.markdown(section_label("01 — Select Excel File"), unsafe_allow_html=True)
-    selected_name = st.selectbox("Excel file:", file_names, label_visibility="collapsed")
+    selected_name = st.selectbox(
+        "Excel file:", file_names, label_visibility="collapsed",
+        format_func=lambda n: f"{n}  ·  {STATUS_ICON.get(file_status.get(n), '')}",
+    )
     selected_path = str(DATA_DIR / selected_name)
+    st.dataframe(pd.DataFrame([
+        {"File": n, "Status": STATUS_ICON.get(file_status.get(n), "—")} for n in file_names
+    ]), use_container_width=True, hide_index=True)
 
     st.markdown("<br>", unsafe_allow_html=True)
     st.markdown(section_label("02 — Experiment Metadata"), unsafe_allow_html=True)
@@ -150,6 +158,41 @@ if vr_blend:
         st.warning(f"⚠️ VR blend total: {total_pct:.1f}% (should equal 100%)")
 
 notes = st.text_area("Notes (optional)", height=72, placeholder="e.g. Run conditions, catalyst info, observations")
+mc1, mc2 = st.columns([3, 2])
+with mc1:
+    import_mode = st.radio("Import mode", ["Full", "Incremental (new days only)"], horizontal=True,
+                           help="Incremental extracts only days after the last stored day, "
+                                "re-checking the most recent days for edited values.")
+with mc2:
+    if import_mode == "Full":
+        force_extract = st.checkbox("Force re-extract (ignore cache and unchanged-file check)")
+    else:
+        recheck_days = st.number_input("Re-check last N days", value=3, min_value=0, max_value=30, step=1)
+
+def show_profile(profile, title="⏱ Extraction profile"):
+    """Stage timings (sheet x stage) and records per catalogue for an import."""
+    if not profile.seconds:
+        return
+    with st.expander(title):
+        totals = profile.stage_totals()
+        st.caption("Total by stage: " + " · ".join(f"{k} {v:.3f}s" for k, v in totals.items()))
+        timings = pd.DataFrame(profile.stage_rows()).pivot_table(
+            index="sheet", columns="stage", values="seconds", aggfunc="sum", fill_value=0.0)
+        st.dataframe(timings[[c for c in totals if c in timings.columns]].round(4),
+                     use_container_width=True)
+        if profile.records:
+            st.dataframe(pd.DataFrame(profile.record_rows()), use_container_width=True, hide_index=True)
+
+def show_rejected(rejected):
+    """Rows the database refused, with the reason."""
+    if not rejected:
+        return
+    st.warning(f"⚠️ {len(rejected)} measurements were rejected and not stored.")
+    with st.expander("Rejected measurements"):
+        st.dataframe(pd.DataFrame([
+            {"Day": row[1], "Parameter": row[5], "Value": repr(row[7]), "Reason": reason}
+            for row, reason in rejected
+        ]), use_container_width=True, hide_index=True)
 
 # ── Import button ─────────────────────────────────────────────────────────────
 st.markdown("<br>", unsafe_allow_html=True)
@@ -166,68 +209,114 @@ if st.button("🚀  Import & Extract Data", type="primary", use_container_width=
             rx3_temp=rx3_temp,
             notes=notes.strip(),
         )
-        records, err = extract_from_file(selected_path, exp_id=exp_id, exp_name=exp_name.strip())
+        if import_mode == "Full":
+            result = import_workbook(selected_path, exp_id=exp_id, exp_name=exp_name.strip(),
+                                     force=force_extract)
+        else:
+            result = import_incremental(selected_path, exp_id=exp_id, exp_name=exp_name.strip(),
+                                        recheck_days=int(recheck_days))
 
-    if err:
-        st.error(f"Extraction error: {err}")
-    elif not records:
+    if import_mode != "Full":
+        if result["error"] and not result["extracted"]:
+            st.info(f"No days after day {result['days_after']} found in the file — nothing to add.")
+        else:
+            st.success(
+                f"✅ **{exp_name}** updated incrementally from day {result['days_after'] + 1} "
+                f"(last stored day {result['last_day']}) — {result['inserted']} new measurements added, "
+                f"{result['updated']} edited values updated ({result['extract_s']:.2f}s extract)."
+            )
+    elif result["source"] == "skipped":
+        st.info(f"✅ **{exp_name}** is up to date — file unchanged since the last import, extraction skipped.")
+    elif result["error"]:
+        st.error(f"Extraction error: {result['error']}")
+    elif not result["extracted"]:
         st.warning("No measurements could be extracted from this file. Check that the file has a 'Master Template' sheet with data.")
     else:
-        inserted = bulk_insert_measurements(records)
-        st.success(f"✅ **{exp_name}** imported successfully — {inserted} new measurements added ({len(records)} extracted from Excel).")
-from utils.db import get_phases
+        source = "from cache" if result["source"] == "cache" else "from Excel"
+        st.success(f"✅ **{exp_name}** imported successfully — {result['inserted']} new measurements added, "
+                   f"{result['ignored']} already stored ({result['extracted']} extracted {source}).")
+    show_rejected(result["rejected"])
+    show_profile(result["profile"])
+
+# ── Bulk import ───────────────────────────────────────────────────────────────
+st.markdown("<br>", unsafe_allow_html=True)
+with st.expander(f"⚡ Bulk Import — all {len(excel_files)} files in EXPERIMENT DATA"):
+    st.caption(
+        f"Extracts every workbook in parallel and writes them to the database. "
+        f"Metadata (type, VR blend, Rx temperatures) is read from `{MANIFEST_NAME}` "
+        f"in the data folder if present; otherwise the file name is used as the experiment name."
+    )
+    bulk_force = st.checkbox("Force re-extract unchanged files", key="bulk_force")
+    if st.button("⚡  Bulk Import All Files", type="secondary", use_container_width=True):
+        bar = st.progress(0.0, text="Starting workers...")
+
+        def _on_progress(done, total, result):
+            bar.progress(done / total, text=f"{done}/{total} — {result['file']}")
+
+        bulk_profile = ExtractProfile()
+        results = bulk_import(progress=_on_progress, force=bulk_force, profile=bulk_profile)
+        bar.empty()
+        st.dataframe(pd.DataFrame([{
+            "File": r["file"],
+            "Experiment": r["exp_name"],
+            "Source": r["source"],
+            "Extracted": r["extracted"],
+            "Inserted": r["inserted"],
+            "Ignored": r["ignored"],
+            "Rejected": len(r["rejected"]),
+            "Extract (s)": r["extract_s"],
+            "Insert (s)": r["insert_s"],
+            "Status": r["error"] or "OK",
+        } for r in results]), use_container_width=True, hide_index=True)
+        total_ins = sum(r["inserted"] for r in results)
+        st.success(f"✅ Bulk import finished — {total_ins:,} new measurements from {len(results)} files.")
+        show_rejected([rej for r in results for rej in r["rejected"]])
+        show_profile(bulk_profile, f"⏱ Extraction profile — {bulk_profile.files} files extracted")
+
+# ── Auto-ingest log ───────────────────────────────────────────────────────────
+ingest_log = get_ingest_log()
+with st.expander(f"🛰 Auto-ingest log — {len(ingest_log)} recent entries"):
+    st.caption(
+        "New or changed workbooks copied into EXPERIMENT DATA are imported automatically "
+        "while the launcher is running (or `python -m utils.watcher`). Files are ingested "
+        "once they have stopped changing for a few seconds."
+    )
+    if ingest_log:
+        st.dataframe(pd.DataFrame([{
+            "Time": r["created_at"],
+            "File": r["file_name"],
+            "Action": r["action"],
+            "Extracted": r["extracted"],
+            "Inserted": r["inserted"],
+            "Updated": r["updated"],
+            "Wait (s)": r["wait_s"],
+            "Extract (s)": r["extract_s"],
+            "Insert (s)": r["insert_s"],
+            "Status": r["error"] or "OK",
+        } for r in ingest_log]), use_container_width=True, hide_index=True)
+    else:
+        st.info("No automatic imports yet.")
 
 # ── Database status ───────────────────────────────────────────────────────────
 st.markdown("<hr>", unsafe_allow_html=True)
 st.markdown(section_label("Current Database Status"), unsafe_allow_html=True)
 
-experiments = get_all_experiments()
-if not experiments:
+summaries = get_experiment_summaries()
+if not summaries:
     st.info("No experiments in the database yet. Use the form above to import your first experiment.")
 else:
-    sorted_exps = sorted(experiments, key=lambda e: e["exp_name"])
-    rows = []
-    for idx, e in enumerate(sorted_exps, start=1):
-        phases = get_phases(e["id"])
-        n_phases = len(phases)
-
-        # Build VR feed names string from phases
-        feed_names = []
-        for p in phases:
-            fn = p.get("feed_name")
-            if fn and fn not in feed_names:
-                feed_names.append(fn)
-        vr_str = ", ".join(feed_names) if feed_names else "—"
-
-        # Build temperature string from phases
-        if phases:
-            temp_parts = []
-            all_default = all(p.get("phase_name", "Default") == "Default" for p in phases)
-            for p in phases:
-                rx1 = p.get("rx1_temp", 0)
-                rx2 = p.get("rx2_temp", 0)
-                rx3 = p.get("rx3_temp", 0)
-                t = f"{rx1:.0f}/{rx2:.0f}/{rx3:.0f}"
-                if not all_default:
-                    label = p.get("phase_name") or "Phase"
-                    t = f"{label}: {t}"
-                temp_parts.append(t)
-            seen = []
-            for t in temp_parts:
-                if t not in seen:
-                    seen.append(t)
-            temp_str = " | ".join(seen)
-        else:
-            temp_str = "—"
-
-        rows.append({
-            "No": idx,
-            "Experiment Name": e["exp_name"],
-            "Start Date": e.get("start_date") or "—",
-            "VR Feed": vr_str,
-            "Phases": n_phases,
-            "Temperature (Rx1/Rx2/Rx3)": temp_str,
-            "Records": get_measurement_count(e["id"]),
-        })
+    rows = [{
+        "No": idx,
+        "Experiment Name": e["exp_name"],
+        "Start Date": e.get("start_date") or "—",
+        "VR Feed": ", ".join(e["feed_names"]) or "—",
+        "Phases": e["n_phases"],
+        "Temperature (Rx1/Rx2/Rx3)": " | ".join(e["temperatures"]) or "—",
+        "Records": e["n_records"],
+    } for idx, e in enumerate(summaries, start=1)]
     st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
 
+cache = read_cache_stats()
+st.caption(f"Read cache (shared by all sessions): {cache['hits']:,} hits / {cache['misses']:,} misses "
+           f"({cache['hit_rate']:.0%}), {cache['entries']}/{cache['max_entries']} entries, "
+           f"{cache['invalidated']:,} invalidated by data changes.")
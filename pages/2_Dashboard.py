@@ -4,14 +4,14 @@ Single experiment view with Lab Results Summary charts + Phase bands.
 """
 import streamlit as st
 import json
-import pandas as pd
 from pathlib import Path
 import sys
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from utils.db import init_db, get_all_experiments, get_measurements, get_experiment, get_phases
-from utils.charts import line_chart, PALETTE, add_phase_bands
+from utils.db import (init_db, get_all_experiments, get_series_bundle, get_experiment, get_phases,
+                      get_measurement_count, get_day_count)
+from utils.charts import line_chart, PALETTE, add_phase_bands, build_param_series, DASHBOARD_TABS, chart_parameters
 
 init_db()
 
@@ -38,16 +38,17 @@ with st.sidebar:
     exp_id = exp_map[selected_name]
 
 exp = get_experiment(exp_id)
-measurements = get_measurements(exp_id)
+chart_keys = chart_parameters(DASHBOARD_TABS)
+bundle = get_series_bundle([exp_id], chart_keys)
 phases = get_phases(exp_id)
-avail_params = set(m["parameter"] for m in measurements)
+avail_params = bundle.parameters(exp_id)
 
 # ── Run metadata card ─────────────────────────────────────────────────────────
 card_col, phase_col = st.columns([2, 1])
 
 with card_col:
-    meas_count = len(measurements)
-    days_count = len(set(m["day"] for m in measurements)) if measurements else 0
+    meas_count = get_measurement_count(exp_id)
+    days_count = get_day_count(exp_id)
 
     # Show phase temperature ranges if available
     if phases:
@@ -150,19 +151,13 @@ with phase_col:
         </div>
         """, unsafe_allow_html=True)
 
-if not measurements:
+if not meas_count:
     st.warning("No measurement data found for this experiment. Go to 📥 Import and (re-)import this file.")
     st.stop()
 
 # ── Helper ────────────────────────────────────────────────────────────────────
 def get_series(param_key, label=None):
-    rows = sorted([m for m in measurements if m["parameter"] == param_key],
-                  key=lambda r: r["day"])
-    return (
-        {"name": label or param_key, "x": [r["day"] for r in rows], "y": [r["value"] for r in rows]},
-        rows[0]["art_low"] if rows else None,
-        rows[0]["art_high"] if rows else None,
-    )
+    return build_param_series(bundle, exp_id, param_key, label)
 
 def chart_or_info(title, y_title, param_pairs, color=None):
     """
@@ -189,56 +184,19 @@ def chart_or_info(title, y_title, param_pairs, color=None):
 # ── Chart tabs ────────────────────────────────────────────────────────────────
 st.markdown("<br>", unsafe_allow_html=True)
 
-tabs = st.tabs([
-    "Cracking Conversion",
-    "CATALYTIC CONVERSION",
-    "Flow & LHSV",
-    "Custom Plot",
-])
+tabs = st.tabs([*DASHBOARD_TABS, "Custom Plot"])
 
-with tabs[0]:
-    chart_or_info(
-        "Cracking Conversion (As is)", "wt%",
-        [("CrkConv", "Cracking Conv. (wt%)")],
-        color="#FFB800" # Molten Gold
-    )
-    chart_or_info(
-        "Total Sedimentation", "ppm",
-        [("Sedimentation", "Sedimentation (ppm)")],
-        color="#FF6B6B" # Coral
-    )
+for tab, columns in zip(tabs, DASHBOARD_TABS.values()):
+    with tab:
+        slots = st.columns(len(columns)) if len(columns) > 1 else [st.container()]
+        for slot, charts in zip(slots, columns):
+            with slot:
+                for c in charts:
+                    chart_or_info(c["title"], c["y_title"], c["series"], color=c["color"])
 
-with tabs[1]:
-    c1, c2 = st.columns(2)
-    with c1:
-        chart_or_info("Sulfur Conversion", "wt%", [("SConv", "S Conv. (wt%)")], color="#C9901A")
-        chart_or_info("Nickel Conversion", "wt%", [("NiConv", "Ni Conv. (wt%)")], color="#00D4FF")
-        chart_or_info("MCR Conversion", "wt%", [("MCRConv", "MCR Conv. (wt%)")], color="#C8A2C8")
-        chart_or_info("C7 Asphaltene Conversion", "wt%", [("C7_AsphConv", "C7 Conv. (wt%)")], color="#FFB800")
-    with c2:
-        chart_or_info("Nitrogen Conversion", "wt%", [("NConv", "N Conv. (wt%)")], color="#7B61FF")
-        chart_or_info("Vanadium Conversion", "wt%", [("VConv", "V Conv. (wt%)")], color="#FF9F43")
-        chart_or_info("Ni+V Conversion", "wt%", [("NiV_Conv", "Ni+V Conv. (wt%)")], color="#00F5A0")
-        chart_or_info("C5 Asphaltene Conversion", "wt%", [("C5_AsphConv", "C5 Conv. (wt%)")], color="#FF6B6B")
-
-
-with tabs[2]:
-    c1, c2 = st.columns(2)
-    with c1:
-        chart_or_info("LHSV — Space Velocity", "hr⁻¹",
-                      [("LHSV_actual", "LHSV Actual (hr⁻¹)")])
-    with c2:
-        chart_or_info("Total Feed Rate", "g/h",
-                      [("Total_rate", "Total Rate (g/h)")])
-
-with tabs[3]:
-    # Filter parameters to only those used in the first three tabs
-    active_keys = [
-        "CrkConv", "Sedimentation", "SConv", "NConv", "NiConv", 
-        "VConv", "NiV_Conv", "MCRConv", "C7_AsphConv", "C5_AsphConv",
-        "LHSV_actual", "Total_rate"
-    ]
-    custom_params = sorted([p for p in active_keys if p in avail_params])
+with tabs[-1]:
+    # Only the parameters charted on the other tabs
+    custom_params = sorted([p for p in chart_keys if p in avail_params])
     
     default_sel = [p for p in ["CrkConv", "SConv"] if p in custom_params]
     selected_params = st.multiselect("Select parameters:", custom_params,
@@ -258,7 +216,8 @@ with tabs[3]:
 
 # ── Raw data expander ─────────────────────────────────────────────────────────
 with st.expander("📋 View Raw Measurement Data"):
-    df = pd.DataFrame(measurements)
+    all_params = st.checkbox("Include all parameters (not only the charted ones)")
+    df = (get_series_bundle([exp_id]) if all_params else bundle).to_frame()
     if not df.empty:
         st.dataframe(
             df[["day", "op_date", "lab_date", "category", "parameter", "unit", "value", "within_spec"]],
@@ -10,8 +10,8 @@ import sys
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from utils.db import init_db, get_all_experiments, get_multi_experiment_measurements
-from utils.charts import multi_experiment_chart, PALETTE
+from utils.db import init_db, get_all_experiments, get_series_bundle, get_measurement_stats
+from utils.charts import multi_experiment_chart, PALETTE, HISTORY_TABS, HISTORY_SUMMARY_PARAMS, chart_parameters
 from utils.styles import inject_css, page_header, section_label
 
 init_db()
@@ -44,7 +44,7 @@ if not selected_names:
     st.stop()
 
 selected_ids = [exp_options[n] for n in selected_names]
-all_measurements = get_multi_experiment_measurements(selected_ids)
+bundle = get_series_bundle(selected_ids, chart_parameters(HISTORY_TABS))
 
 # ── Experiment legend cards ───────────────────────────────────────────────────
 cols = st.columns(min(len(selected_names), 4))
@@ -85,16 +85,9 @@ st.markdown("<br>", unsafe_allow_html=True)
 def overlay_chart(title, y_title, param_key):
     exp_data = []
     for exp_id, exp_name in zip(selected_ids, selected_names):
-        rows = sorted(
-            [m for m in all_measurements if m["exp_id"] == exp_id and m["parameter"] == param_key],
-            key=lambda r: r["day"]
-        )
-        if rows:
-            exp_data.append({
-                "exp_name": exp_name,
-                "x": [r["day"] for r in rows],
-                "y": [r["value"] for r in rows],
-            })
+        days, values = bundle.series(exp_id, param_key)
+        if len(days):
+            exp_data.append({"exp_name": exp_name, "x": days, "y": values})
     if exp_data:
         fig = multi_experiment_chart(title, y_title, exp_data)
         st.plotly_chart(fig, use_container_width=True)
@@ -102,58 +95,33 @@ def overlay_chart(title, y_title, param_key):
         st.info(f"No data for **{param_key}** in the selected experiments.")
 
 # ── Comparison tabs ────────────────────────────────────────────────────────────
-tabs = st.tabs([
-    "Cracking Conversion",
-    "CATALYTIC CONVERSION",
-    "Flow & LHSV",
-])
-
-with tabs[0]:
-    c1, c2 = st.columns(2)
-    with c1:
-        overlay_chart("Cracking Conversion (As is)", "wt%", "CrkConv")
-    with c2:
-        overlay_chart("Total Sedimentation", "ppm", "Sedimentation")
-
-with tabs[1]:
-    c1, c2 = st.columns(2)
-    with c1:
-        overlay_chart("Sulfur Conversion", "wt%", "SConv")
-        overlay_chart("Nickel Conversion", "wt%", "NiConv")
-        overlay_chart("MCR Conversion", "wt%", "MCRConv")
-        overlay_chart("C7 Asphaltene Conversion", "wt%", "C7_AsphConv")
-    with c2:
-        overlay_chart("Nitrogen Conversion", "wt%", "NConv")
-        overlay_chart("Vanadium Conversion", "wt%", "VConv")
-        overlay_chart("Ni+V Conversion", "wt%", "NiV_Conv")
-        overlay_chart("C5 Asphaltene Conversion", "wt%", "C5_AsphConv")
-
-with tabs[2]:
-    c1, c2 = st.columns(2)
-    with c1:
-        overlay_chart("LHSV — Space Velocity", "hr⁻¹", "LHSV_actual")
-    with c2:
-        overlay_chart("Total Feed Rate", "g/h", "Total_rate")
+for tab, columns in zip(st.tabs(list(HISTORY_TABS)), HISTORY_TABS.values()):
+    with tab:
+        for slot, charts in zip(st.columns(len(columns)), columns):
+            with slot:
+                for c in charts:
+                    overlay_chart(c["title"], c["y_title"], c["series"][0][0])
 
 
 # ── Summary stats table ───────────────────────────────────────────────────────
 
 st.markdown("<hr>", unsafe_allow_html=True)
 with st.expander("📊 Summary Statistics (avg over all days)"):
+    # Read from the maintained per-experiment aggregates, not the daily series
+    stats = {(s["exp_id"], s["parameter"]): s
+             for s in get_measurement_stats(selected_ids, HISTORY_SUMMARY_PARAMS)}
     summary_rows = []
-    key_params = ["CrkConv", "NiConv", "VConv", "NiV_Conv", "SConv", "MCRConv", "Sedimentation"]
     for exp_id, exp_name in zip(selected_ids, selected_names):
-        for pk in key_params:
-            rows = [m for m in all_measurements if m["exp_id"] == exp_id and m["parameter"] == pk]
-            if rows:
-                vals = [r["value"] for r in rows]
+        for pk in HISTORY_SUMMARY_PARAMS:
+            s = stats.get((exp_id, pk))
+            if s:
                 summary_rows.append({
                     "Experiment": exp_name,
                     "Parameter": pk,
-                    "N Days": len(vals),
-                    "Mean": round(sum(vals)/len(vals), 2),
-                    "Min": round(min(vals), 2),
-                    "Max": round(max(vals), 2),
+                    "N Days": s["n"],
+                    "Mean": round(s["mean"], 2),
+                    "Min": round(s["min_value"], 2),
+                    "Max": round(s["max_value"], 2),
                 })
     if summary_rows:
         st.dataframe(pd.DataFrame(summary_rows), use_container_width=True, hide_index=True)
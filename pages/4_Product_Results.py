@@ -3,14 +3,13 @@ MEBU Analytics — Product Lab Results Page
 Displays daily results for HPS, LTO, ISV and Gas compositions.
 """
 import streamlit as st
-import pandas as pd
 from pathlib import Path
 import sys
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from utils.db import init_db, get_all_experiments, get_measurements, get_experiment, get_phases
-from utils.charts import line_chart, add_phase_bands
+from utils.db import init_db, get_all_experiments, get_experiment_matrix, get_experiment, get_phases
+from utils.charts import line_chart, add_phase_bands, PRODUCT_TABS, table_categories
 from utils.styles import inject_css, page_header, section_label
 
 init_db()
@@ -35,31 +34,30 @@ with st.sidebar:
     selected_name = st.selectbox("Experiment:", exp_names, index=len(exp_names) - 1)
     exp_id = exp_map[selected_name]
 
-measurements = get_measurements(exp_id)
+# Charts and tables are sliced from the experiment's materialized day x parameter matrix
+matrix = get_experiment_matrix(exp_id)
+product_categories = table_categories(PRODUCT_TABS)
 phases = get_phases(exp_id)
-avail_params = set(m["parameter"] for m in measurements)
+avail_params = set(matrix.parameters)
 
 with st.sidebar:
     st.markdown("---")
     st.markdown("### 📊 Record Counts")
-    cat_counts = {}
-    for m in measurements:
-        cat_counts[m["category"]] = cat_counts.get(m["category"], 0) + 1
+    cat_counts = matrix.category_counts()
     
-    for cat in ["HPS Product", "LTO Product", "ISV Product", "High Gas", "Low Gas"]:
+    for cat in product_categories:
         count = cat_counts.get(cat, 0)
         st.write(f"**{cat}:** {count} records")
 
-if not measurements:
+if not len(matrix):
 
     st.warning("No measurement data found for this experiment. Please (re-)import this file.")
     st.stop()
 
 def get_series(param_key, label=None):
-    rows = sorted([m for m in measurements if m["parameter"] == param_key],
-                  key=lambda r: r["day"])
+    x, y = matrix.series(param_key)
     return (
-        {"name": label or param_key, "x": [r["day"] for r in rows], "y": [r["value"] for r in rows]},
+        {"name": label or param_key, "x": x, "y": y},
     )
 
 def product_chart(title, y_title, param_pairs, color=None):
@@ -82,13 +80,11 @@ def product_chart(title, y_title, param_pairs, color=None):
 
 def product_table(category):
     """Render a pivoted dataframe for a specific product category."""
-    cat_data = [m for m in measurements if m["category"] == category]
-    if not cat_data:
+    # Days as rows, Parameters as columns
+    pivot_df = matrix.frame(category)
+    if pivot_df.empty:
         return
-    
-    df = pd.DataFrame(cat_data)
-    # Pivot: Days as rows, Parameters as columns
-    pivot_df = df.pivot(index="day", columns="parameter", values="value")
+
     # Clean up column names (remove category prefix if exists)
     pivot_df.columns = [c.replace(f"{category.split()[0]}_", "").replace("_", " ") for c in pivot_df.columns]
     
@@ -96,68 +92,16 @@ def product_table(category):
         st.dataframe(pivot_df, use_container_width=True)
 
 # ── Tabs ──────────────────────────────────────────────────────────────────────
-tabs = st.tabs(["HPS Results", "LTO Results", "ISV Results", "Gas Composition"])
-
-with tabs[0]:
-    st.markdown(section_label("HPS Daily Properties"), unsafe_allow_html=True)
-    product_table("HPS Product")
-    c1, c2 = st.columns(2)
-    with c1:
-        product_chart("HPS API (ASTM D4052)", "API", [("HPS_API", "API")], color="#FFB800")
-        product_chart("HPS Sulfur (ASTM D4294)", "wt%", [("HPS_Sulfur", "Sulfur (wt%)")], color="#C9901A")
-        product_chart("HPS CCR (ASTM D4530)", "wt%", [("HPS_CCR", "CCR (wt%)")], color="#C8A2C8")
-    with c2:
-        product_chart("HPS Density (ASTM D4052)", "g/cm³", [("HPS_Density", "Density")], color="#FF6B6B")
-        product_chart("HPS Nitrogen (ASTM D5762)", "ppmw", [("HPS_Nitrogen", "Nitrogen (ppmw)")], color="#7B61FF")
-        product_chart("HPS Sediment (ASTM D4870)", "wt%", [("HPS_Sediment", "Total Sediment (wt%)")], color="#FF9F43")
-
-with tabs[1]:
-    st.markdown(section_label("LTO Daily Properties"), unsafe_allow_html=True)
-    product_table("LTO Product")
-    c1, c2 = st.columns(2)
-    with c1:
-        product_chart("LTO API (ASTM D4052)", "API", [("LTO_API", "API")], color="#FFB800")
-        product_chart("LTO Sulfur (ASTM D4294)", "wt%", [("LTO_Sulfur", "Sulfur (wt%)")], color="#C9901A")
-    with c2:
-        product_chart("LTO Density (ASTM D4052)", "g/cm³", [("LTO_Density", "Density")], color="#FF6B6B")
-        product_chart("LTO Nitrogen (ASTM D5762)", "ppmw", [("LTO_Nitrogen", "Nitrogen (ppmw)")], color="#7B61FF")
-
-with tabs[2]:
-    st.markdown(section_label("ISV Daily Properties"), unsafe_allow_html=True)
-    product_table("ISV Product")
-    c1, c2 = st.columns(2)
-    with c1:
-        product_chart("ISV Sulfur (ASTM D4294)", "wt%", [("ISV_Sulfur", "Sulfur (wt%)")], color="#C9901A")
-        product_chart("ISV Metals (Ni, V)", "ppm", [("ISV_Ni", "Ni (ppm)"), ("ISV_V", "V (ppm)")])
-    with c2:
-        product_chart("ISV 560+", "wt%", [("ISV_560plus", "560+ (wt%)")], color="#FFB800")
-        product_chart("ISV Nitrogen (ASTM D5762)", "ppmw", [("ISV_Nitrogen", "Nitrogen (ppmw)")], color="#7B61FF")
-        product_chart("ISV MCRT", "wt%", [("ISV_MCRT", "MCRT (wt%)")], color="#C8A2C8")
-
-
-
-
-
-
-
-
-with tabs[3]:
-    st.markdown(section_label("Gas Composition"), unsafe_allow_html=True)
-    col_hg, col_lg = st.columns(2)
-    with col_hg:
-        st.markdown(section_label("High Gas"), unsafe_allow_html=True)
-        product_table("High Gas")
-        product_chart("High Gas H2 (ASTM D7833)", "mol%", [("HG_H2", "H2")], color="#C9901A")
-        product_chart("High Gas C1-C3 (ASTM D7833)", "mol%", [("HG_C1", "C1"), ("HG_C2", "C2"), ("HG_C3", "C3")])
-        product_chart("High Gas C4-C6+ & N2 (ASTM D7833)", "mol%", [("HG_C4", "C4"), ("HG_C5", "C5"), ("HG_C6plus", "C6+"), ("HG_N2", "N2")])
-    with col_lg:
-        st.markdown(section_label("Low Gas"), unsafe_allow_html=True)
-        product_table("Low Gas")
-        product_chart("Low Gas H2 (ASTM D7833)", "mol%", [("LG_H2", "H2")], color="#C9901A")
-        product_chart("Low Gas C1-C3 (ASTM D7833)", "mol%", [("LG_C1", "C1"), ("LG_C2", "C2"), ("LG_C3", "C3")])
-        product_chart("Low Gas C4-C6+ & N2 (ASTM D7833)", "mol%", [("LG_C4", "C4"), ("LG_C5", "C5"), ("LG_C6plus", "C6+"), ("LG_N2", "N2")])
-
-
-
-
-
+for tab, spec in zip(st.tabs(list(PRODUCT_TABS)), PRODUCT_TABS.values()):
+    with tab:
+        st.markdown(section_label(spec["section"]), unsafe_allow_html=True)
+        if spec["table"]:
+            product_table(spec["table"])
+        column_tables = spec.get("column_tables", [None] * len(spec["columns"]))
+        for slot, charts, category in zip(st.columns(len(spec["columns"])), spec["columns"], column_tables):
+            with slot:
+                if category:
+                    st.markdown(section_label(category), unsafe_allow_html=True)
+                    product_table(category)
+                for c in charts:
+                    product_chart(c["title"], c["y_title"], c["series"], color=c["color"])
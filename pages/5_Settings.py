@@ -12,7 +12,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from utils.db import (init_db, get_all_experiments, get_experiment,
                       update_experiment_meta, delete_experiment, get_measurement_count,
                       get_all_vr_feeds, upsert_vr_feed, delete_vr_feed,
-                      save_phases, get_phases)
+                      save_phases, get_phases, checkpoint_db)
 from utils.styles import inject_css, page_header, section_label
 from utils.charts import PALETTE, PHASE_COLORS, PHASE_BORDER_COLORS
 
@@ -276,6 +276,7 @@ if st.button("💾  Save All Changes", type="primary", key=f"ssave_{exp_id}"):
     # Auto-push to GitHub
     import subprocess, os
     repo_dir = str(Path(__file__).parent.parent)
+    checkpoint_db()   # the committed .sqlite file must include the WAL contents
     try:
         subprocess.run(["git", "add", "mebu_analytics.sqlite"],
                        cwd=repo_dir, capture_output=True, timeout=10)
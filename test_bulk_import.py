@@ -0,0 +1,68 @@
+"""
+Bulk import into a database that already holds the experiments: their metadata must survive,
+no experiments may be added for known workbooks, and a second run must not write at all.
+
+Run with:  python -m pytest -q test_bulk_import.py
+"""
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import utils.db as db
+from utils.importer import DATA_DIR, bulk_import, list_workbooks
+
+META = ("id", "exp_name", "exp_type", "start_date", "file_path", "vr_blend",
+        "rx1_temp", "rx2_temp", "rx3_temp", "notes")
+
+
+@pytest.fixture
+def populated_db(tmp_path, monkeypatch):
+    """A copy of the committed database (experiments imported elsewhere, no import_files rows)."""
+    if not Path(db.DB_PATH).exists() or not list_workbooks():
+        pytest.skip("needs mebu_analytics.sqlite and the EXPERIMENT DATA workbooks")
+    shutil.copy(db.DB_PATH, tmp_path / "populated.sqlite")
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "populated.sqlite")
+    db.init_db()
+    yield
+    db.close_all_connections()
+
+
+def _metadata():
+    return {e["id"]: tuple(e[k] for k in META) for e in db.get_all_experiments()}
+
+
+def test_bulk_import_keeps_existing_metadata(populated_db):
+    before = _metadata()
+    assert any(m[2] for m in before.values()), "fixture should carry exp_type values"
+
+    results = bulk_import(max_workers=1)
+    assert _metadata() == before
+    imported = {r["file"]: r for r in results}
+    for f in list_workbooks():
+        if imported[f.name]["extracted"]:
+            assert imported[f.name]["exp_id"] in before
+
+    generation = db.data_generation()
+    again = bulk_import(max_workers=1)
+    assert db.data_generation() == generation
+    assert all(r["source"] == "skipped" for r in again if r["exp_id"] is not None)
+    assert _metadata() == before
+
+
+def test_manifest_fields_update_only_what_they_fill(populated_db, tmp_path):
+    before = _metadata()
+    f = next(f for f in list_workbooks() if f.name.startswith("01_Master"))
+    manifest = tmp_path / "manifest.csv"
+    manifest.write_text("file,exp_name,exp_type,start_date,vr_blend,rx1_temp,rx2_temp,rx3_temp,notes\n"
+                        f"\"{f.name}\",,,2024-12-18,,,,,\n", encoding="utf-8")
+
+    results = bulk_import(manifest_path=manifest, max_workers=1)
+    exp_id = next(r["exp_id"] for r in results if r["file"] == f.name)
+    after = _metadata()
+    assert after[exp_id][3] == "2024-12-18"
+    assert after[exp_id][:3] + after[exp_id][4:] == before[exp_id][:3] + before[exp_id][4:]
+    assert {k: v for k, v in after.items() if k != exp_id} == {k: v for k, v in before.items() if k != exp_id}
@@ -0,0 +1,66 @@
+"""
+The streaming (openpyxl) and pandas extractor backends must give the same records.
+
+Run with:  python -m pytest -q test_extractor_parity.py
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import openpyxl
+
+from bench_extractor import make_workbook
+from utils.extractor import extract_from_file, BACKENDS, SHEET_CATALOGUES
+
+DAYS = 5
+FIRST_DAY_COL = 5
+
+
+def _records(path):
+    return {b: sorted(map(repr, extract_from_file(str(path), exp_id=1, backend=b)[0])) for b in BACKENDS}
+
+
+def _row(cells, width=FIRST_DAY_COL + DAYS):
+    out = [None] * width
+    for c, v in cells.items(): out[c] = v
+    return out
+
+
+def _values(cells_value):
+    return {FIRST_DAY_COL + d: cells_value for d in range(DAYS)}
+
+
+def test_synthetic_workbook_parity(tmp_path):
+    path = tmp_path / "synthetic.xlsx"
+    expected = make_workbook(path, days=28, extra_rows=20)
+    records = _records(path)
+    assert records["pandas"] == records["openpyxl"]
+    assert len(records["pandas"]) == expected
+
+
+def test_late_exact_label_wins_in_both_backends(tmp_path):
+    """Every Master Template key has an exact label in columns 2-4 before the last row, but
+    MCRT's exact column-2 label only comes at the end (after row 15). Until then MCRT only
+    substring-matches the MCRT_ART row, so the streaming reader must not stop early."""
+    catalogue = SHEET_CATALOGUES["Master Template"]
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Master Template"
+    for r in [_row({}), _row({2: "Day on stream-->", **{FIRST_DAY_COL + d: d + 1 for d in range(DAYS)}}), _row({})]:
+        ws.append(r)
+    for i in range(15):
+        ws.append(_row({2: f"Filler row {i}"}))
+    ws.append(_row({3: "MCRT, wt%", **_values(5.0)}))
+    for key, info in catalogue.items():
+        if key == "MCRT": continue
+        ws.append(_row({2: info[0][0], **_values(2.0 if key == "MCRT_ART" else 1.0)}))
+    ws.append(_row({2: "MCRT, wt%", **_values(9.0)}))
+    path = tmp_path / "late_label.xlsx"
+    wb.save(path)
+
+    for backend in BACKENDS:
+        records, _ = extract_from_file(str(path), exp_id=1, backend=backend)
+        assert sorted({r["value"] for r in records if r["parameter"] == "MCRT"}) == [9.0], backend
+    records = _records(path)
+    assert records["pandas"] == records["openpyxl"]
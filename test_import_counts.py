@@ -0,0 +1,69 @@
+"""
+Import reports must count measurements only: inserted + ignored == extracted, also with the
+measurement_stats trigger writing alongside every inserted fact.
+
+Run with:  python -m pytest -q test_import_counts.py
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import utils.db as db
+from utils.importer import DATA_DIR, import_workbook, register_workbook
+
+
+@pytest.fixture
+def fresh_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "counts.sqlite")
+    db.init_db()
+    yield
+    db.close_all_connections()
+
+
+def _stats_total(exp_id, by_phase=False):
+    return sum(s["n"] for s in db.get_measurement_stats([exp_id], by_phase=by_phase))
+
+
+def _records(exp_id, days, params=("P1", "P2", "P3")):
+    return [{"exp_id": exp_id, "day": d, "op_date": "", "lab_date": "", "category": "Test",
+             "parameter": p, "unit": "", "value": float(d * 10 + i)}
+            for d in days for i, p in enumerate(params)]
+
+
+@pytest.mark.parametrize("prefix", ["01_Master", "02_Master", "03_Master"])
+def test_workbook_import_counts(fresh_db, prefix):
+    files = sorted(DATA_DIR.glob(f"{prefix}*.xlsx"))
+    if not files:
+        pytest.skip(f"no {prefix} workbook in {DATA_DIR}")
+    exp_id, exp_name, _ = register_workbook(files[0])
+
+    first = import_workbook(files[0], exp_id, exp_name, force=True)
+    assert first["extracted"] > 0
+    assert (first["inserted"], first["ignored"]) == (first["extracted"], 0)
+    assert _stats_total(exp_id) == db.get_measurement_count(exp_id)
+
+    again = import_workbook(files[0], exp_id, exp_name, force=True)
+    assert (again["inserted"], again["ignored"]) == (0, again["extracted"])
+    assert _stats_total(exp_id) == db.get_measurement_count(exp_id)
+
+
+def test_insert_counts_with_overlapping_phases(fresh_db):
+    exp_id = db.upsert_experiment("counts")
+    db.save_phases(exp_id, [{"phase_name": "A", "from_day": 1, "to_day": 5},
+                            {"phase_name": "B", "from_day": 4, "to_day": 10}])
+
+    report = db.insert_measurements(_records(exp_id, range(1, 11)), chunk_size=7)
+    assert (report["inserted"], report["ignored"]) == (30, 0)
+
+    records = _records(exp_id, range(6, 16))
+    report = db.insert_measurements(records, chunk_size=7)
+    assert (report["inserted"], report["ignored"], len(report["rejected"])) == (15, 15, 0)
+    assert report["inserted"] + report["ignored"] == len(records)
+    assert db.bulk_insert_measurements(records) == 0
+
+    assert _stats_total(exp_id) == db.get_measurement_count(exp_id) == 45
+    # phase A: days 1-5, phase B: days 4-10, 3 parameters each
+    assert _stats_total(exp_id, by_phase=True) == 3 * 5 + 3 * 7
@@ -0,0 +1,53 @@
+"""
+Incremental import must pick up every day a sheet has not been imported for, also when the
+sheets of a workbook are filled in at different paces.
+
+Run with:  python -m pytest -q test_incremental_import.py
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import utils.db as db
+from bench_extractor import make_workbook
+from utils.importer import import_incremental, import_workbook
+
+DAYS = 20
+LAGGING_TO = 10
+
+
+@pytest.fixture
+def fresh_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "incremental.sqlite")
+    db.init_db()
+    yield
+    db.close_all_connections()
+
+
+def test_lagging_sheet_gets_its_missing_days(fresh_db, tmp_path):
+    path = tmp_path / "lagging.xlsx"
+    make_workbook(path, days=DAYS, fill=1.0)
+    exp_id = db.upsert_experiment("lagging")
+    full = import_workbook(path, exp_id, "lagging", force=True)
+    assert full["extracted"] == db.get_measurement_count(exp_id)
+
+    # one category was last imported when its sheet only went up to LAGGING_TO
+    last_days = db.get_category_last_days(exp_id)
+    assert set(last_days.values()) == {DAYS}
+    category = sorted(last_days)[0]
+    conn = db.get_conn()
+    conn.execute("DELETE FROM measurements WHERE exp_id=? AND day>? AND param_id IN "
+                 "(SELECT id FROM parameters WHERE category=?)", (exp_id, LAGGING_TO, category))
+    conn.commit()
+    conn.close()
+    assert db.get_category_last_days(exp_id)[category] == LAGGING_TO
+    missing = full["extracted"] - db.get_measurement_count(exp_id)
+    assert missing > 0
+
+    report = import_incremental(path, exp_id, "lagging", recheck_days=3)
+    assert (report["last_day"], report["days_after"]) == (DAYS, LAGGING_TO - 3)
+    assert (report["inserted"], report["updated"]) == (missing, 0)
+    assert db.get_measurement_count(exp_id) == full["extracted"]
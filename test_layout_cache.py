@@ -0,0 +1,43 @@
+"""
+The layout cache must give the same records as full discovery. Its fingerprint only covers
+the header block and the sheet shape, so labels that move within the same shape have to be
+caught by the spot checks.
+
+Run with:  python -m pytest -q test_layout_cache.py
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import openpyxl
+
+from bench_extractor import make_workbook
+from utils.extractor import extract_from_file, layout_fingerprint, BACKENDS, _read_sheets
+
+SHEET = "Master Template"
+
+
+def _records(path, backend, layouts=None):
+    return sorted(map(repr, extract_from_file(str(path), exp_id=1, backend=backend, layouts=layouts)[0]))
+
+
+def test_swapped_labels_same_fingerprint_rediscovered(tmp_path):
+    path, swapped = tmp_path / "template.xlsx", tmp_path / "swapped.xlsx"
+    make_workbook(path, days=10, fill=1.0)
+    wb = openpyxl.load_workbook(path)
+    ws = wb[SHEET]
+    last, prev = ws.cell(ws.max_row, 3), ws.cell(ws.max_row - 1, 3)   # last two parameter labels
+    last.value, prev.value = prev.value, last.value
+    wb.save(swapped)
+
+    before, after = _read_sheets(str(path))[SHEET], _read_sheets(str(swapped))[SHEET]
+    assert layout_fingerprint(SHEET, before) == layout_fingerprint(SHEET, after)
+
+    for backend in BACKENDS:
+        layouts = {}
+        assert _records(path, backend, layouts) == _records(path, backend)
+        cached = dict(layouts)
+        assert _records(path, backend, layouts) == _records(path, backend)
+        assert layouts == cached                      # warm run: nothing rediscovered
+        assert _records(swapped, backend, layouts) == _records(swapped, backend) != _records(path, backend)
@@ -0,0 +1,121 @@
+"""
+EXPLAIN QUERY PLAN check for the queries in utils/db.py: runs the read functions (and the
+no-op paths of the measurement writes) on a copy of mebu_analytics.sqlite, captures the SQL
+they execute with a trace callback on the test's connections, and fails if a filtered query
+scans a table instead of searching an index.
+
+Run with:  python -m pytest -q test_query_plans.py
+"""
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import utils.db as db
+
+PARAMS = ["HPS_API", "S_wt"]
+
+
+def _uncommitted(write):
+    def run(exp_id):
+        conn = db.get_conn()
+        write(conn, [exp_id])
+        conn.close()   # rolls back
+    return run
+
+
+CALLS = {
+    "get_all_experiments": lambda exp_id: db.get_all_experiments(),
+    "get_experiment_summaries": lambda exp_id: db.get_experiment_summaries(),
+    "get_experiment": lambda exp_id: db.get_experiment(exp_id),
+    "get_phases": lambda exp_id: db.get_phases(exp_id),
+    "get_measurements": lambda exp_id: db.get_measurements(exp_id),
+    "get_measurements(parameters)": lambda exp_id: db.get_measurements(exp_id, PARAMS),
+    "get_multi_experiment_measurements":
+        lambda exp_id: db.get_multi_experiment_measurements([exp_id, exp_id + 1], PARAMS),
+    "get_available_parameters(exp_id)": lambda exp_id: db.get_available_parameters(exp_id),
+    "get_available_parameters": lambda exp_id: db.get_available_parameters(),
+    "get_measurement_count": lambda exp_id: db.get_measurement_count(exp_id),
+    "get_day_count": lambda exp_id: db.get_day_count(exp_id),
+    "get_series_bundle": lambda exp_id: db.get_series_bundle([exp_id, exp_id + 1], PARAMS),
+    "get_experiment_matrix": lambda exp_id: db.get_experiment_matrix(exp_id),
+    "_rebuild_matrices": _uncommitted(db._rebuild_matrices),
+    "_refresh_stats": _uncommitted(db._refresh_stats),
+    "get_category_last_days": lambda exp_id: db.get_category_last_days(exp_id),
+    "get_day_values": lambda exp_id: db.get_day_values(exp_id, 1),
+    "get_measurement_stats": lambda exp_id: db.get_measurement_stats([exp_id, exp_id + 1], PARAMS),
+    "get_measurement_stats(by_phase)":
+        lambda exp_id: db.get_measurement_stats([exp_id, exp_id + 1], PARAMS, by_phase=True),
+    # no such experiment: the real statements run, nothing changes
+    "update_measurement_values": lambda exp_id: db.update_measurement_values(
+        [{"exp_id": -1, "parameter": p, "day": 1, "value": 0.0} for p in PARAMS]),
+    "delete_experiment": lambda exp_id: db.delete_experiment(-1),
+}
+
+
+@pytest.fixture(scope="module")
+def plan_db(tmp_path_factory):
+    """A migrated copy of the committed database (an empty one if it is missing) and an
+    experiment id that has measurements."""
+    path = tmp_path_factory.mktemp("plans") / "plan_check.sqlite"
+    if Path(db.DB_PATH).exists():
+        shutil.copy(db.DB_PATH, path)
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(db, "DB_PATH", path)
+        db.init_db()
+        conn = db.get_conn()
+        row = conn.execute("SELECT exp_id FROM measurements LIMIT 1").fetchone()
+        conn.close()
+        yield row[0] if row else 1
+        db.close_all_connections()
+
+
+@pytest.fixture
+def traced(monkeypatch):
+    """SQL executed on the connections get_conn hands out while the test runs."""
+    executed = []
+    get_conn = db.get_conn
+
+    def traced_conn():
+        conn = get_conn()
+        conn.set_trace_callback(executed.append)
+        return conn
+
+    monkeypatch.setattr(db, "get_conn", traced_conn)
+    db.clear_read_cache()
+    yield executed
+    db.close_all_connections()   # drop the traced connections from the pool
+    db.clear_read_cache()
+
+
+def _plan_worthy(executed):
+    """Distinct SELECT / WITH / UPDATE / DELETE / INSERT ... SELECT statements, in run order."""
+    statements = []
+    for sql in executed:
+        sql = " ".join(sql.split())
+        head = sql.split(" ", 1)[0].upper()
+        if sql not in statements and (head in ("SELECT", "WITH", "UPDATE", "DELETE")
+                                      or (head == "INSERT" and " SELECT " in sql.upper())):
+            statements.append(sql)
+    return statements
+
+
+@pytest.mark.parametrize("name", CALLS)
+def test_filtered_queries_use_an_index(plan_db, traced, name):
+    CALLS[name](plan_db)
+    statements = _plan_worthy(traced)
+    assert statements, f"{name} executed no statement worth a plan"
+
+    conn = db.get_conn()
+    conn.set_trace_callback(None)
+    scans = []
+    for sql in statements:
+        plan = [r["detail"] for r in conn.execute("EXPLAIN QUERY PLAN " + sql).fetchall()]
+        if " WHERE " in sql.upper() and any(
+                line.startswith("SCAN") and "COVERING INDEX" not in line for line in plan):
+            scans.append((sql, plan))
+    conn.close()
+    assert not scans, scans
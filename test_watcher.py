@@ -0,0 +1,54 @@
+"""
+The watcher's first scan over a database whose experiments were imported before import
+tracking (no import_files rows) must attach each workbook to its experiment and leave the
+experiment metadata alone.
+
+Run with:  python -m pytest -q test_watcher.py
+"""
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import utils.db as db
+from utils.importer import list_workbooks
+from utils.watcher import FolderWatcher, _is_complete
+
+META = ("id", "exp_name", "exp_type", "start_date", "file_path", "vr_blend",
+        "rx1_temp", "rx2_temp", "rx3_temp", "notes")
+
+
+@pytest.fixture
+def populated_db(tmp_path, monkeypatch):
+    if not Path(db.DB_PATH).exists() or not list_workbooks():
+        pytest.skip("needs mebu_analytics.sqlite and the EXPERIMENT DATA workbooks")
+    shutil.copy(db.DB_PATH, tmp_path / "populated.sqlite")
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "populated.sqlite")
+    db.init_db()
+    yield
+    db.close_all_connections()
+
+
+def _metadata():
+    return {e["id"]: tuple(e[k] for k in META) for e in db.get_all_experiments()}
+
+
+def test_first_poll_keeps_existing_experiments(populated_db):
+    before = _metadata()
+    assert not db.get_all_import_files()
+
+    watcher = FolderWatcher(settle=0)
+    assert watcher.poll() == []          # first sighting: files must settle
+    entries = watcher.poll()
+
+    assert _metadata() == before
+    assert {e["file_name"] for e in entries} == {f.name for f in list_workbooks() if _is_complete(f)}
+    for e in entries:
+        assert e["error"] in (None, "No data found."), e
+        if e["extracted"]:
+            assert e["exp_id"] in before
+            assert e["action"].endswith("existing experiment)")
+    assert watcher.poll() == []          # nothing changed since
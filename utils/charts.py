@@ -183,10 +183,10 @@ def add_phase_bands(fig, phases):
 def line_chart(title, y_title, series_list, art_low=None, art_high=None):
     """
     Generic line chart with Deep Field styling.
-    series_list: [{"name": str, "x": list, "y": list, "color"?: str, "dash"?: str}]
+    series_list: [{"name": str, "x": list | array, "y": list | array, "color"?: str, "dash"?: str}]
     """
     fig = _base_fig(title=title, y_title=y_title)
-    max_day = max((max(s["x"]) for s in series_list if s.get("x")), default=28)
+    max_day = max((max(s["x"]) for s in series_list if len(s.get("x", ()))), default=28)
 
     if art_low is not None and art_high is not None:
         _add_art_band(fig, art_low, art_high, n_days=max_day)
@@ -287,12 +287,125 @@ def vr_blend_donut(vr_blend):
     return fig
 
 
-def build_param_series(measurements, param_key, exp_name=None):
-    """Extract x, y, art_low, art_high from measurement records for one parameter."""
-    rows = sorted([m for m in measurements if m["parameter"] == param_key],
-                  key=lambda r: r["day"])
-    x = [r["day"] for r in rows]
-    y = [r["value"] for r in rows]
-    art_low  = rows[0]["art_low"]  if rows else None
-    art_high = rows[0]["art_high"] if rows else None
-    return {"name": exp_name or param_key, "x": x, "y": y}, art_low, art_high
+def build_param_series(bundle, exp_id, param_key, name=None):
+    """x (days), y, art_low, art_high for one parameter of one experiment from a SeriesBundle."""
+    x, y = bundle.series(exp_id, param_key)
+    meta = bundle.meta(param_key)
+    return {"name": name or param_key, "x": x, "y": y}, meta.get("art_low"), meta.get("art_high")
+
+
+# ── Chart registry ────────────────────────────────────────────────────────────
+# What each page draws, per tab: a list of columns, each a list of charts. Pages render
+# their tabs from here and fetch only chart_parameters() of their registry, so a page
+# never loads parameters it does not show. Product Results tabs also name the product
+# category whose full data table heads the tab ("table") or, per column, heads each
+# column under its own label ("column_tables").
+
+def chart(title, y_title, series, color=None):
+    """series: [(param_key, label), ...]; color forces the first series' color."""
+    return {"title": title, "y_title": y_title, "series": series, "color": color}
+
+
+DASHBOARD_TABS = {
+    "Cracking Conversion": [[
+        chart("Cracking Conversion (As is)", "wt%", [("CrkConv", "Cracking Conv. (wt%)")], "#FFB800"),
+        chart("Total Sedimentation", "ppm", [("Sedimentation", "Sedimentation (ppm)")], "#FF6B6B"),
+    ]],
+    "CATALYTIC CONVERSION": [[
+        chart("Sulfur Conversion", "wt%", [("SConv", "S Conv. (wt%)")], "#C9901A"),
+        chart("Nickel Conversion", "wt%", [("NiConv", "Ni Conv. (wt%)")], "#00D4FF"),
+        chart("MCR Conversion", "wt%", [("MCRConv", "MCR Conv. (wt%)")], "#C8A2C8"),
+        chart("C7 Asphaltene Conversion", "wt%", [("C7_AsphConv", "C7 Conv. (wt%)")], "#FFB800"),
+    ], [
+        chart("Nitrogen Conversion", "wt%", [("NConv", "N Conv. (wt%)")], "#7B61FF"),
+        chart("Vanadium Conversion", "wt%", [("VConv", "V Conv. (wt%)")], "#FF9F43"),
+        chart("Ni+V Conversion", "wt%", [("NiV_Conv", "Ni+V Conv. (wt%)")], "#00F5A0"),
+        chart("C5 Asphaltene Conversion", "wt%", [("C5_AsphConv", "C5 Conv. (wt%)")], "#FF6B6B"),
+    ]],
+    "Flow & LHSV": [[
+        chart("LHSV — Space Velocity", "hr⁻¹", [("LHSV_actual", "LHSV Actual (hr⁻¹)")]),
+    ], [
+        chart("Total Feed Rate", "g/h", [("Total_rate", "Total Rate (g/h)")]),
+    ]],
+}
+
+HISTORY_TABS = {
+    "Cracking Conversion": [[
+        chart("Cracking Conversion (As is)", "wt%", [("CrkConv", "CrkConv")]),
+    ], [
+        chart("Total Sedimentation", "ppm", [("Sedimentation", "Sedimentation")]),
+    ]],
+    "CATALYTIC CONVERSION": [[
+        chart("Sulfur Conversion", "wt%", [("SConv", "SConv")]),
+        chart("Nickel Conversion", "wt%", [("NiConv", "NiConv")]),
+        chart("MCR Conversion", "wt%", [("MCRConv", "MCRConv")]),
+        chart("C7 Asphaltene Conversion", "wt%", [("C7_AsphConv", "C7_AsphConv")]),
+    ], [
+        chart("Nitrogen Conversion", "wt%", [("NConv", "NConv")]),
+        chart("Vanadium Conversion", "wt%", [("VConv", "VConv")]),
+        chart("Ni+V Conversion", "wt%", [("NiV_Conv", "NiV_Conv")]),
+        chart("C5 Asphaltene Conversion", "wt%", [("C5_AsphConv", "C5_AsphConv")]),
+    ]],
+    "Flow & LHSV": [[
+        chart("LHSV — Space Velocity", "hr⁻¹", [("LHSV_actual", "LHSV_actual")]),
+    ], [
+        chart("Total Feed Rate", "g/h", [("Total_rate", "Total_rate")]),
+    ]],
+}
+
+# History summary statistics table
+HISTORY_SUMMARY_PARAMS = ["CrkConv", "NiConv", "VConv", "NiV_Conv", "SConv", "MCRConv", "Sedimentation"]
+
+PRODUCT_TABS = {
+    "HPS Results": {"section": "HPS Daily Properties", "table": "HPS Product", "columns": [[
+        chart("HPS API (ASTM D4052)", "API", [("HPS_API", "API")], "#FFB800"),
+        chart("HPS Sulfur (ASTM D4294)", "wt%", [("HPS_Sulfur", "Sulfur (wt%)")], "#C9901A"),
+        chart("HPS CCR (ASTM D4530)", "wt%", [("HPS_CCR", "CCR (wt%)")], "#C8A2C8"),
+    ], [
+        chart("HPS Density (ASTM D4052)", "g/cm³", [("HPS_Density", "Density")], "#FF6B6B"),
+        chart("HPS Nitrogen (ASTM D5762)", "ppmw", [("HPS_Nitrogen", "Nitrogen (ppmw)")], "#7B61FF"),
+        chart("HPS Sediment (ASTM D4870)", "wt%", [("HPS_Sediment", "Total Sediment (wt%)")], "#FF9F43"),
+    ]]},
+    "LTO Results": {"section": "LTO Daily Properties", "table": "LTO Product", "columns": [[
+        chart("LTO API (ASTM D4052)", "API", [("LTO_API", "API")], "#FFB800"),
+        chart("LTO Sulfur (ASTM D4294)", "wt%", [("LTO_Sulfur", "Sulfur (wt%)")], "#C9901A"),
+    ], [
+        chart("LTO Density (ASTM D4052)", "g/cm³", [("LTO_Density", "Density")], "#FF6B6B"),
+        chart("LTO Nitrogen (ASTM D5762)", "ppmw", [("LTO_Nitrogen", "Nitrogen (ppmw)")], "#7B61FF"),
+    ]]},
+    "ISV Results": {"section": "ISV Daily Properties", "table": "ISV Product", "columns": [[
+        chart("ISV Sulfur (ASTM D4294)", "wt%", [("ISV_Sulfur", "Sulfur (wt%)")], "#C9901A"),
+        chart("ISV Metals (Ni, V)", "ppm", [("ISV_Ni", "Ni (ppm)"), ("ISV_V", "V (ppm)")]),
+    ], [
+        chart("ISV 560+", "wt%", [("ISV_560plus", "560+ (wt%)")], "#FFB800"),
+        chart("ISV Nitrogen (ASTM D5762)", "ppmw", [("ISV_Nitrogen", "Nitrogen (ppmw)")], "#7B61FF"),
+        chart("ISV MCRT", "wt%", [("ISV_MCRT", "MCRT (wt%)")], "#C8A2C8"),
+    ]]},
+    "Gas Composition": {"section": "Gas Composition", "table": None, "columns": [[
+        chart("High Gas H2 (ASTM D7833)", "mol%", [("HG_H2", "H2")], "#C9901A"),
+        chart("High Gas C1-C3 (ASTM D7833)", "mol%", [("HG_C1", "C1"), ("HG_C2", "C2"), ("HG_C3", "C3")]),
+        chart("High Gas C4-C6+ & N2 (ASTM D7833)", "mol%",
+              [("HG_C4", "C4"), ("HG_C5", "C5"), ("HG_C6plus", "C6+"), ("HG_N2", "N2")]),
+    ], [
+        chart("Low Gas H2 (ASTM D7833)", "mol%", [("LG_H2", "H2")], "#C9901A"),
+        chart("Low Gas C1-C3 (ASTM D7833)", "mol%", [("LG_C1", "C1"), ("LG_C2", "C2"), ("LG_C3", "C3")]),
+        chart("Low Gas C4-C6+ & N2 (ASTM D7833)", "mol%",
+              [("LG_C4", "C4"), ("LG_C5", "C5"), ("LG_C6plus", "C6+"), ("LG_N2", "N2")]),
+    ]], "column_tables": ["High Gas", "Low Gas"]},
+}
+
+
+def chart_parameters(tabs, extra=()):
+    """Every parameter key the charts of a tab registry draw (plus extra), in first-use order."""
+    keys = []
+    for tab in tabs.values():
+        columns = tab["columns"] if isinstance(tab, dict) else tab
+        for column in columns:
+            for c in column:
+                keys += [pk for pk, _ in c["series"]]
+    return list(dict.fromkeys([*keys, *extra]))
+
+
+def table_categories(tabs):
+    """Product categories whose full data table a Product Results registry shows."""
+    return [cat for tab in tabs.values() for cat in [tab["table"], *tab.get("column_tables", [])] if cat]
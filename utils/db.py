@@ -1,22 +1,237 @@
 """
 SQLite database layer for MEBU Analytics Platform.
-Two tables: experiments (run-level metadata) and measurements (daily data).
+experiments (run-level metadata) and measurements (daily values), with parameter
+metadata and per-day dates normalized into parameters and experiment_days.
 """
+import functools
+import math
+import os
 import sqlite3
 import json
-from pathlib import Path
+import threading
+import zlib
+from collections import OrderedDict
+from itertools import islice
+from pathlib import Path, PureWindowsPath
+
+import numpy as np
+import pandas as pd
 
 DB_PATH = Path(__file__).parent.parent / "mebu_analytics.sqlite"
 
+# ── Connection pool ──────────────────────────────────────────────────────────
+# get_conn() hands out pooled connections; conn.close() returns them to the pool
+# (rolling back anything uncommitted) instead of closing the file. Connections are
+# keyed by process and DB_PATH, so forked workers and a changed DB_PATH never share one.
+
+POOL_SIZE = 4   # idle connections kept per database file
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA busy_timeout=5000",
+)
+
+_pool_lock = threading.Lock()
+_pool = {}
+_pool_stats = {"opened": 0, "reused": 0, "discarded": 0}
+
+
+class _PooledConnection(sqlite3.Connection):
+    def close(self):
+        _release(self)
+
 
 def get_conn():
-    conn = sqlite3.connect(str(DB_PATH))
-    conn.row_factory = sqlite3.Row
+    key = (os.getpid(), str(DB_PATH))
+    with _pool_lock:
+        idle = _pool.get(key)
+        conn = idle.pop() if idle else None
+        _pool_stats["reused" if conn else "opened"] += 1
+    if conn is None:
+        conn = sqlite3.connect(key[1], factory=_PooledConnection, check_same_thread=False)
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        conn.row_factory = sqlite3.Row
+        conn.pool_key = key
     return conn
 
 
+def _release(conn):
+    if conn.in_transaction:
+        conn.rollback()
+    conn.row_factory = sqlite3.Row
+    with _pool_lock:
+        idle = _pool.setdefault(conn.pool_key, [])
+        if conn in idle:
+            return
+        if len(idle) < POOL_SIZE:
+            idle.append(conn)
+            return
+        _pool_stats["discarded"] += 1
+    sqlite3.Connection.close(conn)
+
+
+def pool_stats():
+    """Connections opened, reused and discarded (pool full) so far, plus idle ones per database."""
+    with _pool_lock:
+        return {**_pool_stats, "idle": {path: len(idle) for (_, path), idle in _pool.items()}}
+
+
+def close_all_connections():
+    """Really close every idle pooled connection (e.g. before the database file is replaced)."""
+    with _pool_lock:
+        idle = [c for conns in _pool.values() for c in conns]
+        _pool.clear()
+    for conn in idle:
+        sqlite3.Connection.close(conn)
+    clear_read_cache()
+
+
+def checkpoint_db():
+    """Fold the WAL file back into the main database file so the .sqlite file alone is complete."""
+    conn = get_conn()
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    conn.close()
+
+
+# ── Read cache ───────────────────────────────────────────────────────────────
+# The page-level read functions are memoized process-wide, so every Streamlit rerun and
+# every session shares one warm cache. Entries are keyed on function, arguments, DB_PATH and
+# the data generation: PRAGMA data_version of a sentinel connection that never writes, which
+# changes whenever any other connection (this process or another, e.g. the watcher) commits.
+# A new generation drops that database's entries. Cached results are shared between callers
+# and must be treated as read-only.
+
+READ_CACHE_SIZE = 256   # entries kept, least recently used evicted first
+
+_cache_lock = threading.Lock()
+_read_cache = OrderedDict()
+_cache_stats = {"hits": 0, "misses": 0, "evicted": 0, "invalidated": 0}
+_generations = {}   # DB_PATH -> generation the cached entries belong to
+_sentinels = {}     # (pid, DB_PATH) -> (epoch, connection)
+_sentinel_epoch = 0
+
+
+def data_generation():
+    """A value that changes whenever data is committed to the database file."""
+    global _sentinel_epoch
+    key = (os.getpid(), str(DB_PATH))
+    with _cache_lock:
+        if key not in _sentinels:
+            _sentinel_epoch += 1
+            _sentinels[key] = (_sentinel_epoch, sqlite3.connect(key[1], check_same_thread=False))
+        epoch, conn = _sentinels[key]
+        return epoch, conn.execute("PRAGMA data_version").fetchone()[0]
+
+
+def _freeze(value):
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(value)
+    return value
+
+
+def cached_read(fn):
+    """Serve fn from the read cache while the database is unchanged."""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        db, generation = str(DB_PATH), data_generation()
+        key = (fn.__name__, db, generation, _freeze(args), _freeze(sorted(kwargs.items())))
+        with _cache_lock:
+            if _generations.get(db) != generation:
+                stale = [k for k in _read_cache if k[1] == db]
+                for k in stale:
+                    del _read_cache[k]
+                _cache_stats["invalidated"] += len(stale)
+                _generations[db] = generation
+            if key in _read_cache:
+                _cache_stats["hits"] += 1
+                _read_cache.move_to_end(key)
+                return _read_cache[key]
+            _cache_stats["misses"] += 1
+        result = fn(*args, **kwargs)
+        with _cache_lock:
+            _read_cache[key] = result
+            while len(_read_cache) > READ_CACHE_SIZE:
+                _read_cache.popitem(last=False)
+                _cache_stats["evicted"] += 1
+        return result
+    return wrapper
+
+
+def read_cache_stats():
+    """Hits, misses, evicted (cache full) and invalidated (data changed) entries, plus current size."""
+    with _cache_lock:
+        lookups = _cache_stats["hits"] + _cache_stats["misses"]
+        return {**_cache_stats, "entries": len(_read_cache), "max_entries": READ_CACHE_SIZE,
+                "hit_rate": _cache_stats["hits"] / lookups if lookups else 0.0}
+
+
+def clear_read_cache():
+    with _cache_lock:
+        _read_cache.clear()
+        _generations.clear()
+        sentinels = [conn for _, conn in _sentinels.values()]
+        _sentinels.clear()
+    for conn in sentinels:
+        conn.close()
+
+
+# measurements is a narrow fact table; parameter metadata and the per-day dates live
+# once in the parameters and experiment_days dimension tables. Facts are clustered on
+# (exp_id, param_id, day): every page reads one experiment's series per parameter.
+MEASUREMENTS_DDL = """
+    CREATE TABLE IF NOT EXISTS {name} (
+        exp_id      INTEGER NOT NULL REFERENCES experiments(id) ON DELETE CASCADE,
+        param_id    INTEGER NOT NULL REFERENCES parameters(id),
+        day         INTEGER NOT NULL,
+        value       REAL,
+        PRIMARY KEY (exp_id, param_id, day)
+    ) WITHOUT ROWID
+"""
+
+# The old one-row-per-measurement shape, for get_measurements and friends. Dates come from the
+# day, so rows of sheets without dates (product, gas) show the day's Master Template dates.
+MEASUREMENTS_VIEW = """
+    CREATE VIEW IF NOT EXISTS measurements_wide AS
+    SELECT m.exp_id, m.day, COALESCE(d.op_date, '') AS op_date, COALESCE(d.lab_date, '') AS lab_date,
+           p.category, p.parameter, p.unit, m.value, p.art_low, p.art_high, 'N/A' AS within_spec
+    FROM measurements m
+    JOIN parameters p ON p.id = m.param_id
+    LEFT JOIN experiment_days d ON d.exp_id = m.exp_id AND d.day = m.day
+"""
+
+INDEXES = (
+    # day-ordered reads per experiment: get_category_last_days, get_day_values, ORDER BY day
+    # (a WITHOUT ROWID index also carries the primary key, so param_id comes for free)
+    "CREATE INDEX IF NOT EXISTS idx_measurements_exp_day ON measurements(exp_id, day, value)",
+    "CREATE INDEX IF NOT EXISTS idx_phases_exp_day ON phases(exp_id, from_day)",
+)
+
+
+# PRAGMA user_version counts the MIGRATIONS (bottom of this module) applied to a database
+# file. init_db applies the missing ones once per file and process; after that every call,
+# i.e. every Streamlit rerun, is a set lookup.
+_schema_lock = threading.Lock()
+_schema_ready = set()
+
+
 def init_db():
-    """Create tables if they don't exist."""
+    """Bring the database schema up to date (once per database file per process)."""
+    key = (os.getpid(), str(DB_PATH))
+    if key in _schema_ready:
+        return
+    with _schema_lock:
+        if key not in _schema_ready:
+            migrate_schema()
+            _schema_ready.add(key)
+
+
+def _create_tables():
     conn = get_conn()
     c = conn.cursor()
 
@@ -38,23 +253,28 @@ def init_db():
     """)
 
     c.execute("""
-        CREATE TABLE IF NOT EXISTS measurements (
-            id          INTEGER PRIMARY KEY AUTOINCREMENT,
-            exp_id      INTEGER REFERENCES experiments(id) ON DELETE CASCADE,
-            day         INTEGER,
-            op_date     TEXT,
-            lab_date    TEXT,
+        CREATE TABLE IF NOT EXISTS parameters (
+            id          INTEGER PRIMARY KEY,
+            parameter   TEXT NOT NULL UNIQUE,
             category    TEXT,
-            parameter   TEXT,
             unit        TEXT,
-            value       REAL,
             art_low     REAL,
-            art_high    REAL,
-            within_spec TEXT,
-            UNIQUE(exp_id, day, parameter)
+            art_high    REAL
         )
     """)
 
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS experiment_days (
+            exp_id      INTEGER NOT NULL REFERENCES experiments(id) ON DELETE CASCADE,
+            day         INTEGER NOT NULL,
+            op_date     TEXT DEFAULT '',
+            lab_date    TEXT DEFAULT '',
+            PRIMARY KEY (exp_id, day)
+        ) WITHOUT ROWID
+    """)
+
+    c.execute(MEASUREMENTS_DDL.format(name="measurements"))
+
     c.execute("""
         CREATE TABLE IF NOT EXISTS vr_feeds (
             id          INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -77,9 +297,65 @@ def init_db():
         )
     """)
 
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS import_files (
+            file_path   TEXT PRIMARY KEY,
+            exp_id      INTEGER REFERENCES experiments(id) ON DELETE CASCADE,
+            size        INTEGER,
+            mtime       REAL,
+            sha256      TEXT,
+            imported_at TEXT DEFAULT (datetime('now'))
+        )
+    """)
+
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS extraction_cache (
+            sha256      TEXT NOT NULL,
+            extractor   TEXT NOT NULL,
+            n_records   INTEGER,
+            records     BLOB,
+            created_at  TEXT DEFAULT (datetime('now')),
+            PRIMARY KEY (sha256, extractor)
+        )
+    """)
+
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS sheet_layouts (
+            fingerprint TEXT PRIMARY KEY,
+            sheet_name  TEXT,
+            layout      TEXT,
+            hits        INTEGER DEFAULT 0,
+            created_at  TEXT DEFAULT (datetime('now'))
+        )
+    """)
+
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS ingest_log (
+            id          INTEGER PRIMARY KEY AUTOINCREMENT,
+            file_name   TEXT,
+            exp_id      INTEGER,
+            action      TEXT,
+            extracted   INTEGER DEFAULT 0,
+            inserted    INTEGER DEFAULT 0,
+            updated     INTEGER DEFAULT 0,
+            error       TEXT,
+            wait_s      REAL,
+            extract_s   REAL,
+            insert_s    REAL,
+            created_at  TEXT DEFAULT (datetime('now', 'localtime'))
+        )
+    """)
+
+    conn.commit()
+    conn.close()
+
+
+def _create_views_and_indexes():
+    conn = get_conn()
+    for ddl in (MEASUREMENTS_VIEW, *INDEXES):
+        conn.execute(ddl)
     conn.commit()
     conn.close()
-    _migrate_existing_to_phases()
 
 
 # ── Experiments ──────────────────────────────────────────────────────────────
@@ -109,10 +385,14 @@ def upsert_experiment(exp_name, exp_type="", start_date="", file_path="",
 
 
 def update_experiment_meta(exp_id, vr_blend=None, rx1_temp=None, rx2_temp=None,
-                           rx3_temp=None, notes=None):
-    """Update only the editable metadata fields."""
+                           rx3_temp=None, notes=None, exp_type=None, start_date=None):
+    """Update only the editable metadata fields (None leaves a field as it is)."""
     conn = get_conn()
     c = conn.cursor()
+    if exp_type is not None:
+        c.execute("UPDATE experiments SET exp_type=? WHERE id=?", (exp_type, exp_id))
+    if start_date is not None:
+        c.execute("UPDATE experiments SET start_date=? WHERE id=?", (start_date, exp_id))
     if vr_blend is not None:
         c.execute("UPDATE experiments SET vr_blend=? WHERE id=?",
                   (json.dumps(vr_blend), exp_id))
@@ -128,6 +408,26 @@ def update_experiment_meta(exp_id, vr_blend=None, rx1_temp=None, rx2_temp=None,
     conn.close()
 
 
+def find_experiment(file_path, exp_name=None):
+    """id of the experiment a workbook belongs to, or None: the one its last import was recorded
+    for, else one named exp_name or after the file stem, else one whose stored file_path has the
+    same file name (it may have been imported on another machine)."""
+    file_path = Path(file_path)
+    conn = get_conn()
+    row = conn.execute("""
+        SELECT i.exp_id FROM import_files i JOIN experiments e ON e.id = i.exp_id WHERE i.file_path=?
+    """, (str(file_path),)).fetchone()
+    for name in (exp_name, file_path.stem):
+        if row is None and name:
+            row = conn.execute("SELECT id FROM experiments WHERE exp_name=?", (name,)).fetchone()
+    if row is None:
+        row = next((r for r in conn.execute("SELECT id, file_path FROM experiments WHERE file_path != ''")
+                    if PureWindowsPath(r["file_path"]).name == file_path.name), None)
+    conn.close()
+    return row[0] if row else None
+
+
+@cached_read
 def get_all_experiments():
     conn = get_conn()
     rows = conn.execute("SELECT * FROM experiments ORDER BY start_date").fetchall()
@@ -135,6 +435,44 @@ def get_all_experiments():
     return [dict(r) for r in rows]
 
 
+@cached_read
+def get_experiment_summaries():
+    """All experiments (by name) with their record count, day span, phase count, distinct feed
+    names and per-phase temperature strings, in two queries however many experiments exist."""
+    conn = get_conn()
+    rows = conn.execute("""
+        SELECT e.*,
+               COALESCE(m.n_records, 0) AS n_records, m.first_day, m.last_day,
+               COALESCE(p.n_phases, 0) AS n_phases, COALESCE(p.all_default, 0) AS all_default
+        FROM experiments e
+        LEFT JOIN (SELECT exp_id, COUNT(*) AS n_records, MIN(day) AS first_day, MAX(day) AS last_day
+                   FROM measurements GROUP BY exp_id) m ON m.exp_id = e.id
+        LEFT JOIN (SELECT exp_id, COUNT(*) AS n_phases, MIN(phase_name = 'Default') AS all_default
+                   FROM phases GROUP BY exp_id) p ON p.exp_id = e.id
+        ORDER BY e.exp_name
+    """).fetchall()
+    phase_rows = conn.execute("""
+        SELECT p.exp_id, f.feed_name, COALESCE(NULLIF(p.phase_name, ''), 'Phase') AS label,
+               printf('%.0f/%.0f/%.0f', p.rx1_temp, p.rx2_temp, p.rx3_temp) AS temps
+        FROM phases p
+        LEFT JOIN vr_feeds f ON p.feed_id = f.id
+        ORDER BY p.exp_id, p.from_day
+    """).fetchall()
+    conn.close()
+
+    summaries = {r["id"]: {**dict(r), "feed_names": [], "temperatures": []} for r in rows}
+    for p in phase_rows:
+        s = summaries.get(p["exp_id"])
+        if s is None: continue
+        temp = p["temps"] if s["all_default"] else f"{p['label']}: {p['temps']}"
+        if p["feed_name"] and p["feed_name"] not in s["feed_names"]:
+            s["feed_names"].append(p["feed_name"])
+        if temp not in s["temperatures"]:
+            s["temperatures"].append(temp)
+    return list(summaries.values())
+
+
+@cached_read
 def get_experiment(exp_id):
     conn = get_conn()
     row = conn.execute("SELECT * FROM experiments WHERE id=?", (exp_id,)).fetchone()
@@ -145,6 +483,11 @@ def get_experiment(exp_id):
 def delete_experiment(exp_id):
     conn = get_conn()
     conn.execute("DELETE FROM experiments WHERE id=?", (exp_id,))
+    conn.execute("DELETE FROM measurements WHERE exp_id=?", (exp_id,))
+    conn.execute("DELETE FROM experiment_days WHERE exp_id=?", (exp_id,))
+    conn.execute("DELETE FROM experiment_matrices WHERE exp_id=?", (exp_id,))
+    conn.execute("DELETE FROM measurement_stats WHERE exp_id=?", (exp_id,))
+    conn.execute("DELETE FROM import_files WHERE exp_id=?", (exp_id,))
     conn.commit()
     conn.close()
 
@@ -167,6 +510,7 @@ def upsert_vr_feed(feed_name, composition):
     return feed_id
 
 
+@cached_read
 def get_all_vr_feeds():
     conn = get_conn()
     rows = conn.execute("SELECT * FROM vr_feeds ORDER BY feed_name").fetchall()
@@ -203,10 +547,12 @@ def save_phases(exp_id, phases_list):
             VALUES (?, ?, ?, ?, ?, ?, ?, ?)
         """, (exp_id, p.get("phase_name", ""), p["from_day"], p["to_day"],
               p.get("feed_id"), p.get("rx1_temp"), p.get("rx2_temp"), p.get("rx3_temp")))
+    _refresh_stats(conn, [exp_id], phases_only=True)
     conn.commit()
     conn.close()
 
 
+@cached_read
 def get_phases(exp_id):
     """Return phases for one experiment, joined with feed name."""
     conn = get_conn()
@@ -221,52 +567,242 @@ def get_phases(exp_id):
     return [dict(r) for r in rows]
 
 
+def create_default_phases(exp_ids=None):
+    """Give experiments (all, or those in exp_ids) that have a vr_blend or temperatures but no
+    phases a single Default phase spanning their stored days."""
+    conn = get_conn()
+    c = conn.cursor()
+    if exp_ids is None:
+        experiments = c.execute("SELECT * FROM experiments").fetchall()
+    else:
+        placeholders = ",".join("?" * len(exp_ids))
+        experiments = c.execute(f"SELECT * FROM experiments WHERE id IN ({placeholders})", list(exp_ids)).fetchall()
+    created = []
+    for exp in experiments:
+        exp = dict(exp)
+        existing = c.execute("SELECT COUNT(*) FROM phases WHERE exp_id=?", (exp["id"],)).fetchone()[0]
+        if existing > 0:
+            continue
+        vr_blend = json.loads(exp.get("vr_blend") or "[]")
+        if not vr_blend and not exp.get("rx1_temp"):
+            continue
+        max_day_row = c.execute("SELECT MAX(day) FROM measurements WHERE exp_id=?", (exp["id"],)).fetchone()
+        max_day = max_day_row[0] if max_day_row and max_day_row[0] else 28
+        feed_id = None
+        if vr_blend:
+            feed_name = f"{exp['exp_name']}_blend"
+            comp_json = json.dumps(vr_blend)
+            c.execute("INSERT OR IGNORE INTO vr_feeds (feed_name, composition) VALUES (?, ?)",
+                      (feed_name, comp_json))
+            feed_row = c.execute("SELECT id FROM vr_feeds WHERE feed_name=?", (feed_name,)).fetchone()
+            feed_id = feed_row[0] if feed_row else None
+        c.execute("""
+            INSERT INTO phases (exp_id, phase_name, from_day, to_day, feed_id, rx1_temp, rx2_temp, rx3_temp)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, (exp["id"], "Default", 1, max_day, feed_id,
+              exp.get("rx1_temp"), exp.get("rx2_temp"), exp.get("rx3_temp")))
+        created.append(exp["id"])
+    _refresh_stats(conn, created, phases_only=True)
+    conn.commit()
+    conn.close()
+
+
 # ── Measurements ─────────────────────────────────────────────────────────────
 
-def bulk_insert_measurements(records):
-    """Insert list of measurement dicts, ignoring duplicates. Returns count inserted."""
+def _measurement_rows(records):
+    """Insert tuples from a columnar RecordBatch (anything with .rows()) or from record dicts."""
+    if hasattr(records, "rows"):
+        return records.rows()
+    return ((r.get("exp_id"), r.get("day"), r.get("op_date", ""), r.get("lab_date", ""),
+             r.get("category"), r.get("parameter"), r.get("unit", ""),
+             r.get("value"), r.get("art_low"), r.get("art_high"),
+             r.get("within_spec", "N/A")) for r in records)
+
+INSERT_MEASUREMENT_SQL = "INSERT OR IGNORE INTO measurements (exp_id, param_id, day, value) VALUES (?, ?, ?, ?)"
+
+UPSERT_PARAMETER_SQL = """
+    INSERT INTO parameters (parameter, category, unit, art_low, art_high) VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(parameter) DO UPDATE SET
+        category=excluded.category, unit=excluded.unit, art_low=excluded.art_low, art_high=excluded.art_high
+"""
+
+# Dates belong to the day: the first non-blank date seen is kept, in a chunk and across
+# upserts alike (sheets may disagree; Master Template is read first). Later ones only fill blanks.
+UPSERT_DAY_SQL = """
+    INSERT INTO experiment_days (exp_id, day, op_date, lab_date) VALUES (?, ?, ?, ?)
+    ON CONFLICT(exp_id, day) DO UPDATE SET
+        op_date=COALESCE(NULLIF(op_date, ''), excluded.op_date),
+        lab_date=COALESCE(NULLIF(lab_date, ''), excluded.lab_date)
+    WHERE (COALESCE(op_date, '') = '' AND excluded.op_date != '')
+       OR (COALESCE(lab_date, '') = '' AND excluded.lab_date != '')
+"""
+
+def _load_parameters(conn):
+    """{parameter: (id, category, unit, art_low, art_high)} for every known parameter."""
+    return {r[1]: (r[0], *r[2:]) for r in conn.execute(
+        "SELECT id, parameter, category, unit, art_low, art_high FROM parameters")}
+
+def _store_rows(conn, rows, known):
+    """Upsert the parameters and days of rows, then insert their facts. Returns the count inserted.
+    known is the _load_parameters dict and is kept up to date."""
+    for row in rows:
+        _, _, _, _, category, parameter, unit, _, art_low, art_high = row[:10]
+        meta = (category, unit, art_low, art_high)
+        entry = known.get(parameter)
+        if entry is None or entry[1:] != meta:
+            conn.execute(UPSERT_PARAMETER_SQL, (parameter, *meta))
+            param_id = conn.execute("SELECT id FROM parameters WHERE parameter=?", (parameter,)).fetchone()[0]
+            known[parameter] = (param_id, *meta)
+    days = {}
+    for row in rows:
+        exp_id, day, op_date, lab_date = row[:4]
+        old = days.get((exp_id, day), ("", ""))
+        days[(exp_id, day)] = (old[0] or op_date or "", old[1] or lab_date or "")
+    conn.executemany(UPSERT_DAY_SQL, [(*k, *v) for k, v in days.items()])
+    # rowcount counts only the facts themselves, not the measurement_stats trigger's writes
+    return conn.executemany(INSERT_MEASUREMENT_SQL, [(r[0], known[r[5]][0], r[1], r[7]) for r in rows]).rowcount
+
+def _rejection(row):
+    """Why a measurement row cannot be stored, or None if it is fine."""
+    exp_id, day, _, _, _, parameter, _, value = row[:8]
+    if exp_id is None: return "missing exp_id"
+    if day is None: return "missing day"
+    if not parameter: return "missing parameter"
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        return f"value is not a finite number: {value!r}"
+    return None
+
+def insert_measurements(records, chunk_size=5000, matrices=True):
+    """Insert measurements with executemany, one transaction per chunk of chunk_size rows.
+    records is a list or generator of dicts, or a columnar RecordBatch from the extractor.
+    Returns {"inserted", "ignored" (already stored), "rejected": [(row, reason), ...]}.
+    measurement_stats follows through its insert trigger; the experiment matrices are rebuilt
+    unless matrices=False (the caller then calls rebuild_matrices once its writes are done)."""
+    report = {"inserted": 0, "ignored": 0, "rejected": []}
+    if records is None:
+        return report
+    rows = iter(_measurement_rows(records))
+    conn = get_conn()
+    known = _load_parameters(conn)
+    touched = set()
+    while True:
+        chunk, n = [], 0
+        for row in islice(rows, chunk_size):
+            n += 1
+            reason = _rejection(row)
+            if reason:
+                report["rejected"].append((row, reason))
+            else:
+                chunk.append(row)
+        if not n:
+            break
+        try:
+            inserted = _store_rows(conn, chunk, known)
+            conn.commit()
+        except sqlite3.Error:
+            # Find the offending rows one by one; everything else in the chunk still goes in.
+            conn.rollback()
+            known, inserted, good = _load_parameters(conn), 0, []
+            for row in chunk:
+                try:
+                    inserted += _store_rows(conn, [row], known)
+                    good.append(row)
+                except sqlite3.Error as e:
+                    report["rejected"].append((row, str(e)))
+            conn.commit()
+            chunk = good
+        report["inserted"] += inserted
+        report["ignored"] += len(chunk) - inserted
+        if inserted:
+            touched.update(row[0] for row in chunk)
+    if touched and matrices:
+        _rebuild_matrices(conn, touched)
+        conn.commit()
+    conn.close()
+    return report
+
+def bulk_insert_measurements(records, chunk_size=5000):
+    """Insert measurements, ignoring duplicates. Returns count inserted
+    (insert_measurements gives the full inserted / ignored / rejected report)."""
+    if not records:
+        return 0
+    return insert_measurements(records, chunk_size)["inserted"]
+
+
+def get_category_last_days(exp_id):
+    """Highest day on stream stored per parameter category of an experiment, as {category: day}
+    (empty if none). Sheets are filled in at different paces, so one category's last day says
+    nothing about another's."""
+    conn = get_conn()
+    rows = conn.execute(
+        "SELECT COALESCE(p.category, '') AS category, MAX(m.day) AS last_day "
+        "FROM measurements m JOIN parameters p ON p.id = m.param_id "
+        "WHERE m.exp_id=? GROUP BY 1",
+        (exp_id,)
+    ).fetchall()
+    conn.close()
+    return {r["category"]: r["last_day"] for r in rows}
+
+
+def get_day_values(exp_id, from_day):
+    """Stored values for days >= from_day as {(day, parameter): value}."""
+    conn = get_conn()
+    rows = conn.execute(
+        "SELECT m.day, p.parameter, m.value FROM measurements m JOIN parameters p ON p.id = m.param_id "
+        "WHERE m.exp_id=? AND m.day>=?",
+        (exp_id, from_day)
+    ).fetchall()
+    conn.close()
+    return {(r["day"], r["parameter"]): r["value"] for r in rows}
+
+
+def update_measurement_values(records, matrices=True):
+    """Overwrite the value of existing measurements; their days' blank dates are filled like on
+    insert (a known date is kept). matrices as for insert_measurements. Returns count updated."""
     if not records:
         return 0
     conn = get_conn()
     c = conn.cursor()
-    inserted = 0
+    ids = {parameter: entry[0] for parameter, entry in _load_parameters(conn).items()}
+    updated, days = 0, {}
     for r in records:
-        try:
-            c.execute("""
-                INSERT OR IGNORE INTO measurements
-                    (exp_id, day, op_date, lab_date, category, parameter,
-                     unit, value, art_low, art_high, within_spec)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (r["exp_id"], r["day"], r.get("op_date", ""), r.get("lab_date", ""),
-                  r["category"], r["parameter"], r.get("unit", ""),
-                  r["value"], r.get("art_low"), r.get("art_high"),
-                  r.get("within_spec", "N/A")))
-            inserted += c.rowcount
-        except Exception:
-            pass
+        param_id = ids.get(r["parameter"])
+        if param_id is None: continue
+        c.execute("UPDATE measurements SET value=? WHERE exp_id=? AND param_id=? AND day=?",
+                  (r["value"], r["exp_id"], param_id, r["day"]))
+        updated += c.rowcount
+        if c.rowcount:
+            old = days.get((r["exp_id"], r["day"]), ("", ""))
+            days[(r["exp_id"], r["day"])] = (old[0] or r.get("op_date") or "", old[1] or r.get("lab_date") or "")
+    c.executemany(UPSERT_DAY_SQL, [(*k, *v) for k, v in days.items()])
+    if matrices:
+        _rebuild_matrices(conn, {exp_id for exp_id, _ in days})
+    _refresh_stats(conn, {exp_id for exp_id, _ in days})
     conn.commit()
     conn.close()
-    return inserted
+    return updated
 
 
+@cached_read
 def get_measurements(exp_id, parameters=None):
     """Return measurements for one experiment as list of dicts."""
     conn = get_conn()
     if parameters:
         placeholders = ",".join("?" * len(parameters))
         rows = conn.execute(
-            f"SELECT * FROM measurements WHERE exp_id=? AND parameter IN ({placeholders}) ORDER BY day",
+            f"SELECT * FROM measurements_wide WHERE exp_id=? AND parameter IN ({placeholders}) ORDER BY day",
             [exp_id] + list(parameters)
         ).fetchall()
     else:
         rows = conn.execute(
-            "SELECT * FROM measurements WHERE exp_id=? ORDER BY day",
+            "SELECT * FROM measurements_wide WHERE exp_id=? ORDER BY day",
             (exp_id,)
         ).fetchall()
     conn.close()
     return [dict(r) for r in rows]
 
 
+@cached_read
 def get_multi_experiment_measurements(exp_ids, parameters=None):
     """Return measurements for multiple experiments as list of dicts."""
     if not exp_ids:
@@ -276,7 +812,7 @@ def get_multi_experiment_measurements(exp_ids, parameters=None):
     if parameters:
         pphs = ",".join("?" * len(parameters))
         rows = conn.execute(
-            f"SELECT m.*, e.exp_name FROM measurements m "
+            f"SELECT m.*, e.exp_name FROM measurements_wide m "
             f"JOIN experiments e ON m.exp_id=e.id "
             f"WHERE m.exp_id IN ({placeholders}) AND m.parameter IN ({pphs}) "
             f"ORDER BY m.exp_id, m.day",
@@ -284,7 +820,7 @@ def get_multi_experiment_measurements(exp_ids, parameters=None):
         ).fetchall()
     else:
         rows = conn.execute(
-            f"SELECT m.*, e.exp_name FROM measurements m "
+            f"SELECT m.*, e.exp_name FROM measurements_wide m "
             f"JOIN experiments e ON m.exp_id=e.id "
             f"WHERE m.exp_id IN ({placeholders}) ORDER BY m.exp_id, m.day",
             list(exp_ids)
@@ -293,22 +829,230 @@ def get_multi_experiment_measurements(exp_ids, parameters=None):
     return [dict(r) for r in rows]
 
 
+class SeriesBundle:
+    """Day and value arrays per (exp_id, parameter), each sorted by day, with parameter metadata.
+    Built by get_series_bundle; it lives in the read cache, so its arrays are read-only."""
+
+    FRAME_COLUMNS = ("exp_id", "day", "op_date", "lab_date", "category", "parameter", "unit",
+                     "value", "art_low", "art_high", "within_spec")
+
+    def __init__(self, exp_ids, exp_id, param_id, day, value, params, dates):
+        # exp_id, param_id, day, value: parallel arrays in (exp_id, param_id, day) order
+        self.exp_ids = list(exp_ids)
+        self.exp_id, self.param_id, self.day, self.value = exp_id, param_id, day, value
+        for a in (exp_id, param_id, day, value):
+            a.flags.writeable = False
+        self.params = params   # param_id -> (parameter, category, unit, art_low, art_high)
+        self.dates = dates     # [(exp_id, day, op_date, lab_date)]
+        starts = np.flatnonzero(np.r_[True, (np.diff(exp_id) != 0) | (np.diff(param_id) != 0)]) if len(day) else []
+        ends = np.r_[starts[1:], len(day)] if len(day) else []
+        self._slices = {(int(exp_id[a]), params[int(param_id[a])][0]): slice(int(a), int(b))
+                        for a, b in zip(starts, ends)}
+        self._by_name = {meta[0]: meta for meta in params.values()}
+        self._frame = None
+
+    def __len__(self):
+        return len(self.value)
+
+    def series(self, exp_id, parameter):
+        """(days, values) of one experiment's parameter; empty arrays if it has no data."""
+        sl = self._slices.get((exp_id, parameter), slice(0, 0))
+        return self.day[sl], self.value[sl]
+
+    def parameters(self, exp_id=None):
+        """Names of the parameters with data (in one experiment, or in any)."""
+        return {p for e, p in self._slices if exp_id is None or e == exp_id}
+
+    def meta(self, parameter):
+        """{"category", "unit", "art_low", "art_high"} of a parameter ({} if unknown)."""
+        meta = self._by_name.get(parameter)
+        return dict(zip(("category", "unit", "art_low", "art_high"), meta[1:])) if meta else {}
+
+    def n_days(self, exp_id=None):
+        days = self.day if exp_id is None else self.day[self.exp_id == exp_id]
+        return len(np.unique(days))
+
+    def to_frame(self):
+        """One row per measurement in the get_measurements column layout (ordered by experiment
+        and day) as a pandas DataFrame, built column-wise and kept for later calls."""
+        if self._frame is None:
+            facts = pd.DataFrame({"exp_id": self.exp_id, "param_id": self.param_id,
+                                  "day": self.day, "value": self.value})
+            params = pd.DataFrame([(pid, *meta) for pid, meta in self.params.items()],
+                                  columns=["param_id", "parameter", "category", "unit", "art_low", "art_high"])
+            dates = pd.DataFrame(self.dates, columns=["exp_id", "day", "op_date", "lab_date"])
+            frame = (facts.merge(params, on="param_id", how="left")
+                          .merge(dates, on=["exp_id", "day"], how="left")
+                          .sort_values(["exp_id", "day"], kind="stable", ignore_index=True))
+            frame[["op_date", "lab_date"]] = frame[["op_date", "lab_date"]].fillna("")
+            frame["within_spec"] = "N/A"
+            self._frame = frame[list(self.FRAME_COLUMNS)]
+        return self._frame
+
+
+# Each experiment's measurements are also kept as a dense days x parameters matrix (NaN where
+# nothing is stored) in experiment_matrices: int32 day and int64 param_id axes plus the
+# zlib-compressed float64 matrix. The write functions rebuild it whenever that experiment's
+# facts change; series, bundles and pivot tables are sliced from it instead of the long table.
+
+class ExperimentMatrix:
+    """Days x parameters value matrix of one experiment, with axis labels and parameter metadata."""
+
+    def __init__(self, exp_id, days, param_ids, values, params):
+        self.exp_id = exp_id
+        self.days, self.param_ids, self.values = days, param_ids, values
+        for a in (days, param_ids, values):
+            a.flags.writeable = False
+        self.parameters = [params[int(pid)][0] for pid in param_ids]
+        self.categories = np.array([params[int(pid)][1] or "" for pid in param_ids], dtype=object)
+        self._meta = {params[int(pid)][0]: params[int(pid)][1:] for pid in param_ids}
+        self._col = {name: i for i, name in enumerate(self.parameters)}
+
+    def __len__(self):
+        return int(np.count_nonzero(~np.isnan(self.values)))
+
+    def series(self, parameter):
+        """(days, values) of one parameter, sorted by day; empty arrays if it has no data."""
+        i = self._col.get(parameter)
+        if i is None:
+            return self.days[:0], np.empty(0)
+        keep = ~np.isnan(self.values[:, i])
+        return self.days[keep], self.values[keep, i]
+
+    def meta(self, parameter):
+        meta = self._meta.get(parameter)
+        return dict(zip(("category", "unit", "art_low", "art_high"), meta)) if meta else {}
+
+    def category_counts(self):
+        """{category: number of stored values}."""
+        counts = np.count_nonzero(~np.isnan(self.values), axis=0)
+        out = {}
+        for category, n in zip(self.categories, counts.tolist()):
+            out[category] = out.get(category, 0) + n
+        return out
+
+    def frame(self, category=None):
+        """Pivot table (day index, one column per parameter, sorted by name) of one category or
+        of everything, keeping only days with at least one value."""
+        cols = np.arange(len(self.parameters)) if category is None else np.flatnonzero(self.categories == category)
+        cols = sorted(cols.tolist(), key=lambda i: self.parameters[i])
+        block = self.values[:, cols]
+        rows = ~np.isnan(block).all(axis=1)
+        return pd.DataFrame(block[rows], index=pd.Index(self.days[rows], name="day"),
+                            columns=pd.Index([self.parameters[i] for i in cols], name="parameter"))
+
+
+def _build_matrix(conn, exp_id):
+    """(days, param_ids, values) of one experiment from the fact table."""
+    rows = conn.execute("SELECT param_id, day, value FROM measurements WHERE exp_id=?", (exp_id,)).fetchall()
+    block = np.array([tuple(r) for r in rows], dtype=float).reshape(-1, 3)
+    param_ids = np.unique(block[:, 0]).astype(np.int64)
+    days = np.unique(block[:, 1]).astype(np.int64)
+    values = np.full((len(days), len(param_ids)), np.nan)
+    values[np.searchsorted(days, block[:, 1]), np.searchsorted(param_ids, block[:, 0])] = block[:, 2]
+    return days, param_ids, values
+
+
+def _rebuild_matrices(conn, exp_ids):
+    """Rebuild and store the matrices of exp_ids (dropping those of experiments without data)."""
+    for exp_id in exp_ids:
+        days, param_ids, values = _build_matrix(conn, exp_id)
+        if not len(days):
+            conn.execute("DELETE FROM experiment_matrices WHERE exp_id=?", (exp_id,))
+            continue
+        conn.execute("""
+            INSERT OR REPLACE INTO experiment_matrices (exp_id, n_days, n_params, days, param_ids, matrix)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (exp_id, len(days), len(param_ids), days.astype(np.int32).tobytes(), param_ids.tobytes(),
+              zlib.compress(values.tobytes(), 6)))
+
+
+def _load_matrices(conn, exp_ids):
+    """{exp_id: (days, param_ids, values)}. Matrices are stored by the writes; any that are missing
+    (e.g. experiments without data) are built in memory, so this read path never writes."""
+    exp_ids = list(dict.fromkeys(exp_ids))
+    rows = conn.execute(
+        f"SELECT * FROM experiment_matrices WHERE exp_id IN ({','.join('?' * len(exp_ids))})", exp_ids
+    ).fetchall()
+    out = {}
+    for r in rows:
+        values = np.frombuffer(zlib.decompress(r["matrix"]), dtype=np.float64).reshape(r["n_days"], r["n_params"])
+        out[r["exp_id"]] = (np.frombuffer(r["days"], dtype=np.int32).astype(np.int64),
+                            np.frombuffer(r["param_ids"], dtype=np.int64).copy(), values.copy())
+    for e in exp_ids:
+        if e not in out:
+            out[e] = _build_matrix(conn, e)
+    return out
+
+
+def rebuild_matrices(exp_ids):
+    """Rebuild the stored matrices of exp_ids, after writes made with matrices=False."""
+    conn = get_conn()
+    _rebuild_matrices(conn, exp_ids)
+    conn.commit()
+    conn.close()
+
+
+@cached_read
+def get_experiment_matrix(exp_id):
+    """The ExperimentMatrix of one experiment (empty if it has no measurements)."""
+    conn = get_conn()
+    params = {r[0]: tuple(r[1:]) for r in conn.execute(
+        "SELECT id, parameter, category, unit, art_low, art_high FROM parameters")}
+    days, param_ids, values = _load_matrices(conn, [exp_id])[exp_id]
+    conn.close()
+    return ExperimentMatrix(exp_id, days, param_ids, values, params)
+
+
+@cached_read
+def get_series_bundle(exp_ids, parameters=None):
+    """Measurements of one or more experiments (optionally only some parameters) as a SeriesBundle,
+    sliced from the experiment matrices in (exp_id, param_id, day) order, so every series is sorted."""
+    exp_ids = [exp_ids] if isinstance(exp_ids, int) else list(exp_ids)
+    conn = get_conn()
+    params = {r[0]: tuple(r[1:]) for r in conn.execute(
+        "SELECT id, parameter, category, unit, art_low, art_high FROM parameters")}
+    matrices = _load_matrices(conn, exp_ids)
+    dates = [tuple(r) for r in conn.execute(
+        f"SELECT exp_id, day, op_date, lab_date FROM experiment_days WHERE exp_id IN ({','.join('?' * len(exp_ids))})",
+        exp_ids
+    )]
+    conn.close()
+    wanted = None if parameters is None else [pid for pid, meta in params.items() if meta[0] in set(parameters)]
+    parts = []
+    for exp_id in sorted(matrices):
+        days, param_ids, values = matrices[exp_id]
+        cols = np.arange(len(param_ids)) if wanted is None else np.flatnonzero(np.isin(param_ids, wanted))
+        block = values[:, cols].T
+        p, d = np.nonzero(~np.isnan(block))
+        parts.append((np.full(len(p), exp_id, dtype=np.int64), param_ids[cols][p], days[d], block[p, d]))
+    if parts:
+        columns = [np.concatenate(c) for c in zip(*parts)]
+    else:
+        columns = [np.empty(0, dtype=np.int64) for _ in range(3)] + [np.empty(0)]
+    return SeriesBundle(exp_ids, *columns, params, dates)
+
+
+@cached_read
 def get_available_parameters(exp_id=None):
     """List all unique parameter names in DB (or for one experiment)."""
     conn = get_conn()
     if exp_id:
         rows = conn.execute(
-            "SELECT DISTINCT parameter, category, unit FROM measurements WHERE exp_id=? ORDER BY category, parameter",
+            "SELECT parameter, category, unit FROM parameters "
+            "WHERE id IN (SELECT param_id FROM measurements WHERE exp_id=?) ORDER BY category, parameter",
             (exp_id,)
         ).fetchall()
     else:
         rows = conn.execute(
-            "SELECT DISTINCT parameter, category, unit FROM measurements ORDER BY category, parameter"
+            "SELECT parameter, category, unit FROM parameters "
+            "WHERE id IN (SELECT param_id FROM measurements) ORDER BY category, parameter"
         ).fetchall()
     conn.close()
     return [dict(r) for r in rows]
 
 
+@cached_read
 def get_measurement_count(exp_id):
     conn = get_conn()
     n = conn.execute("SELECT COUNT(*) FROM measurements WHERE exp_id=?", (exp_id,)).fetchone()[0]
@@ -316,35 +1060,332 @@ def get_measurement_count(exp_id):
     return n
 
 
+@cached_read
+def get_day_count(exp_id):
+    """Number of distinct days on stream with stored measurements."""
+    conn = get_conn()
+    n = conn.execute("SELECT COUNT(DISTINCT day) FROM measurements WHERE exp_id=?", (exp_id,)).fetchone()[0]
+    conn.close()
+    return n
+
+
+# ── Statistics ───────────────────────────────────────────────────────────────
+# measurement_stats holds count, sum, sum of squares, min, max and first / last day per
+# (experiment, phase, parameter); phase_id 0 is the whole experiment. New facts are added
+# row by row by an insert trigger (ignored duplicates never fire it). Edits that cannot be
+# applied incrementally (changed values, changed phases) recompute the experiment's rows.
+
+ALL_DAYS = 0   # phase_id of the whole-experiment statistics
+
+STATS_TRIGGER = """
+    CREATE TRIGGER IF NOT EXISTS trg_measurement_stats AFTER INSERT ON measurements
+    WHEN NEW.value IS NOT NULL
+    BEGIN
+        INSERT INTO measurement_stats (exp_id, phase_id, param_id, n, total, total_sq,
+                                       min_value, max_value, first_day, last_day)
+        SELECT NEW.exp_id, 0, NEW.param_id, 1, NEW.value, NEW.value * NEW.value,
+               NEW.value, NEW.value, NEW.day, NEW.day
+        UNION ALL
+        SELECT NEW.exp_id, id, NEW.param_id, 1, NEW.value, NEW.value * NEW.value,
+               NEW.value, NEW.value, NEW.day, NEW.day
+        FROM phases WHERE exp_id = NEW.exp_id AND NEW.day BETWEEN from_day AND to_day
+        ON CONFLICT (exp_id, phase_id, param_id) DO UPDATE SET
+            n = n + 1, total = total + excluded.total, total_sq = total_sq + excluded.total_sq,
+            min_value = MIN(min_value, excluded.min_value), max_value = MAX(max_value, excluded.max_value),
+            first_day = MIN(first_day, excluded.first_day), last_day = MAX(last_day, excluded.last_day);
+    END
+"""
+
+STATS_COLUMNS = "exp_id, phase_id, param_id, n, total, total_sq, min_value, max_value, first_day, last_day"
+STATS_AGGREGATES = ("COUNT(m.value), SUM(m.value), SUM(m.value * m.value), MIN(m.value), MAX(m.value), "
+                    "MIN(m.day), MAX(m.day)")
+
+
+def _refresh_stats(conn, exp_ids, phases_only=False):
+    """Recompute the statistics of exp_ids from the fact table (only the per-phase rows if phases_only)."""
+    exp_ids = list(exp_ids)
+    if not exp_ids:
+        return
+    placeholders = ",".join("?" * len(exp_ids))
+    conn.execute(f"DELETE FROM measurement_stats WHERE exp_id IN ({placeholders})"
+                 + (f" AND phase_id != {ALL_DAYS}" if phases_only else ""), exp_ids)
+    if not phases_only:
+        conn.execute(f"""
+            INSERT INTO measurement_stats ({STATS_COLUMNS})
+            SELECT m.exp_id, {ALL_DAYS}, m.param_id, {STATS_AGGREGATES}
+            FROM measurements m
+            WHERE m.exp_id IN ({placeholders}) AND m.value IS NOT NULL
+            GROUP BY m.exp_id, m.param_id
+        """, exp_ids)
+    conn.execute(f"""
+        INSERT INTO measurement_stats ({STATS_COLUMNS})
+        SELECT m.exp_id, p.id, m.param_id, {STATS_AGGREGATES}
+        FROM measurements m
+        JOIN phases p ON p.exp_id = m.exp_id AND m.day BETWEEN p.from_day AND p.to_day
+        WHERE m.exp_id IN ({placeholders}) AND m.value IS NOT NULL
+        GROUP BY m.exp_id, p.id, m.param_id
+    """, exp_ids)
+
+
+@cached_read
+def get_measurement_stats(exp_ids, parameters=None, by_phase=False):
+    """Count, mean, std, min, max and first / last day per experiment and parameter, over all days
+    or (by_phase) per phase, as list of dicts ordered by experiment, phase start and parameter."""
+    if not exp_ids:
+        return []
+    where = f"s.exp_id IN ({','.join('?' * len(exp_ids))}) AND s.phase_id {'!=' if by_phase else '='} {ALL_DAYS}"
+    args = list(exp_ids)
+    if parameters:
+        where += f" AND p.parameter IN ({','.join('?' * len(parameters))})"
+        args += list(parameters)
+    conn = get_conn()
+    rows = conn.execute(f"""
+        SELECT s.exp_id, s.phase_id, ph.phase_name, p.parameter, p.category, p.unit,
+               s.n, s.total, s.total_sq, s.min_value, s.max_value, s.first_day, s.last_day
+        FROM measurement_stats s
+        JOIN parameters p ON p.id = s.param_id
+        LEFT JOIN phases ph ON ph.id = s.phase_id
+        WHERE {where}
+        ORDER BY s.exp_id, ph.from_day, p.category, p.parameter
+    """, args).fetchall()
+    conn.close()
+    stats = []
+    for r in rows:
+        r = dict(r)
+        n = r["n"]
+        # sum-of-squares variance cancels badly on constant series, which have none
+        var = (r["total_sq"] - r["total"] * r["total"] / n) / (n - 1) if r["max_value"] > r["min_value"] else 0.0
+        r.update(mean=r["total"] / n, std=math.sqrt(max(var, 0.0)))
+        stats.append(r)
+    return stats
+
+
+# ── Import tracking & extraction cache ───────────────────────────────────────
+
+def get_import_file(file_path):
+    conn = get_conn()
+    row = conn.execute("SELECT * FROM import_files WHERE file_path=?", (str(file_path),)).fetchone()
+    conn.close()
+    return dict(row) if row else None
+
+
+def get_all_import_files():
+    conn = get_conn()
+    rows = conn.execute("SELECT * FROM import_files").fetchall()
+    conn.close()
+    return {r["file_path"]: dict(r) for r in rows}
+
+
+def record_import_file(file_path, exp_id, size, mtime, sha256):
+    """Remember the size, mtime and content hash of a successfully imported workbook."""
+    conn = get_conn()
+    conn.execute("""
+        INSERT INTO import_files (file_path, exp_id, size, mtime, sha256, imported_at)
+        VALUES (?, ?, ?, ?, ?, datetime('now'))
+        ON CONFLICT(file_path) DO UPDATE SET
+            exp_id      = excluded.exp_id,
+            size        = excluded.size,
+            mtime       = excluded.mtime,
+            sha256      = excluded.sha256,
+            imported_at = excluded.imported_at
+    """, (str(file_path), exp_id, size, mtime, sha256))
+    conn.commit()
+    conn.close()
+
+
+def get_cached_records(sha256, extractor, exp_id):
+    """Return the cached record list for a workbook hash, stamped with exp_id, or None."""
+    conn = get_conn()
+    row = conn.execute("SELECT records FROM extraction_cache WHERE sha256=? AND extractor=?",
+                       (sha256, extractor)).fetchone()
+    conn.close()
+    if not row:
+        return None
+    payload = json.loads(zlib.decompress(row["records"]))
+    columns = payload["columns"]
+    return [dict(zip(columns, values), exp_id=exp_id) for values in payload["rows"]]
+
+
+def put_cached_records(sha256, extractor, records):
+    """Store a record set (dicts or a RecordBatch, without exp_id) as zlib-compressed column/row JSON."""
+    if hasattr(records, "rows"):
+        columns = list(records.COLUMNS[1:])
+        rows = list(records.rows(with_exp_id=False))
+    else:
+        columns = [k for k in (records[0] if records else {}) if k != "exp_id"]
+        rows = [[r.get(k) for k in columns] for r in records]
+    payload = json.dumps({"columns": columns, "rows": rows})
+    conn = get_conn()
+    conn.execute("""
+        INSERT OR REPLACE INTO extraction_cache (sha256, extractor, n_records, records)
+        VALUES (?, ?, ?, ?)
+    """, (sha256, extractor, len(records), zlib.compress(payload.encode(), 6)))
+    conn.commit()
+    conn.close()
+
+class SheetLayoutStore:
+    """Dict-like view of the sheet_layouts table for the extractor's layout cache.
+    Holds no connection, so it can be handed to worker processes."""
+
+    def get(self, fingerprint, default=None):
+        conn = get_conn()
+        row = conn.execute("SELECT layout FROM sheet_layouts WHERE fingerprint=?", (fingerprint,)).fetchone()
+        conn.close()
+        return json.loads(row["layout"]) if row else default
+
+    def __setitem__(self, fingerprint, layout):
+        conn = get_conn()
+        conn.execute("""
+            INSERT OR REPLACE INTO sheet_layouts (fingerprint, sheet_name, layout)
+            VALUES (?, ?, ?)
+        """, (fingerprint, layout.get("sheet_name", ""), json.dumps(layout)))
+        conn.commit()
+        conn.close()
+
+def get_all_sheet_layouts():
+    """{fingerprint: layout} snapshot, for worker processes that must not write."""
+    conn = get_conn()
+    rows = conn.execute("SELECT fingerprint, layout FROM sheet_layouts").fetchall()
+    conn.close()
+    return {r["fingerprint"]: json.loads(r["layout"]) for r in rows}
+
+def save_sheet_layouts(layouts):
+    store = SheetLayoutStore()
+    for fingerprint, layout in layouts.items():
+        store[fingerprint] = layout
+
+
+# ── Ingest log ───────────────────────────────────────────────────────────────
+
+def log_ingest(file_name, exp_id=None, action="", extracted=0, inserted=0, updated=0,
+               error=None, wait_s=None, extract_s=None, insert_s=None):
+    conn = get_conn()
+    conn.execute("""
+        INSERT INTO ingest_log (file_name, exp_id, action, extracted, inserted, updated,
+                                error, wait_s, extract_s, insert_s)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, (file_name, exp_id, action, extracted, inserted, updated, error, wait_s, extract_s, insert_s))
+    conn.commit()
+    conn.close()
+
+def get_ingest_log(limit=50):
+    """Most recent auto-ingest entries, newest first."""
+    conn = get_conn()
+    rows = conn.execute("SELECT * FROM ingest_log ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+    conn.close()
+    return [dict(r) for r in rows]
+
+
 # ── Migration ────────────────────────────────────────────────────────────────
 
-def _migrate_existing_to_phases():
-    """One-time migration: convert old vr_blend + temps into a single phase per experiment."""
+def _migrate_measurements_normalized():
+    """One-time migration: split a wide measurements table (one row with text metadata and dates
+    per value) into parameters, experiment_days and the narrow fact table, then reclaim the space."""
     conn = get_conn()
+    cols = [r["name"] for r in conn.execute("PRAGMA table_info(measurements)")]
+    if "parameter" not in cols:
+        conn.close()
+        return
     c = conn.cursor()
-    experiments = c.execute("SELECT * FROM experiments").fetchall()
-    for exp in experiments:
-        exp = dict(exp)
-        existing = c.execute("SELECT COUNT(*) FROM phases WHERE exp_id=?", (exp["id"],)).fetchone()[0]
-        if existing > 0:
-            continue
-        vr_blend = json.loads(exp.get("vr_blend") or "[]")
-        if not vr_blend and not exp.get("rx1_temp"):
-            continue
-        max_day_row = c.execute("SELECT MAX(day) FROM measurements WHERE exp_id=?", (exp["id"],)).fetchone()
-        max_day = max_day_row[0] if max_day_row and max_day_row[0] else 28
-        feed_id = None
-        if vr_blend:
-            feed_name = f"{exp['exp_name']}_blend"
-            comp_json = json.dumps(vr_blend)
-            c.execute("INSERT OR IGNORE INTO vr_feeds (feed_name, composition) VALUES (?, ?)",
-                      (feed_name, comp_json))
-            feed_row = c.execute("SELECT id FROM vr_feeds WHERE feed_name=?", (feed_name,)).fetchone()
-            feed_id = feed_row[0] if feed_row else None
-        c.execute("""
-            INSERT INTO phases (exp_id, phase_name, from_day, to_day, feed_id, rx1_temp, rx2_temp, rx3_temp)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, (exp["id"], "Default", 1, max_day, feed_id,
-              exp.get("rx1_temp"), exp.get("rx2_temp"), exp.get("rx3_temp")))
+    c.execute("DROP VIEW IF EXISTS measurements_wide")
+    c.execute("""
+        INSERT OR IGNORE INTO parameters (parameter, category, unit, art_low, art_high)
+        SELECT parameter, MAX(category), MAX(unit), MAX(art_low), MAX(art_high)
+        FROM measurements WHERE parameter IS NOT NULL GROUP BY parameter
+    """)
+    c.execute("""
+        INSERT OR IGNORE INTO experiment_days (exp_id, day, op_date, lab_date)
+        SELECT exp_id, day, COALESCE(MAX(NULLIF(op_date, '')), ''), COALESCE(MAX(NULLIF(lab_date, '')), '')
+        FROM measurements WHERE exp_id IS NOT NULL AND day IS NOT NULL GROUP BY exp_id, day
+    """)
+    c.execute("DROP TABLE IF EXISTS measurements_narrow")
+    c.execute(MEASUREMENTS_DDL.format(name="measurements_narrow"))
+    c.execute("""
+        INSERT OR IGNORE INTO measurements_narrow (exp_id, param_id, day, value)
+        SELECT m.exp_id, p.id, m.day, m.value
+        FROM measurements m JOIN parameters p ON p.parameter = m.parameter
+        WHERE m.exp_id IS NOT NULL AND m.day IS NOT NULL
+        ORDER BY m.exp_id, p.id, m.day
+    """)
+    c.execute("DROP TABLE measurements")
+    c.execute("ALTER TABLE measurements_narrow RENAME TO measurements")
     conn.commit()
+    conn.execute("VACUUM")
+    conn.close()
+
+
+def _create_experiment_matrices():
+    conn = get_conn()
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS experiment_matrices (
+            exp_id      INTEGER PRIMARY KEY REFERENCES experiments(id) ON DELETE CASCADE,
+            n_days      INTEGER,
+            n_params    INTEGER,
+            days        BLOB,
+            param_ids   BLOB,
+            matrix      BLOB,
+            built_at    TEXT DEFAULT (datetime('now'))
+        )
+    """)
+    exp_ids = [r[0] for r in conn.execute("SELECT DISTINCT exp_id FROM measurements")]
+    _rebuild_matrices(conn, exp_ids)
+    conn.commit()
+    conn.close()
+
+
+def _create_measurement_stats():
+    conn = get_conn()
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS measurement_stats (
+            exp_id      INTEGER NOT NULL,
+            phase_id    INTEGER NOT NULL,
+            param_id    INTEGER NOT NULL,
+            n           INTEGER,
+            total       REAL,
+            total_sq    REAL,
+            min_value   REAL,
+            max_value   REAL,
+            first_day   INTEGER,
+            last_day    INTEGER,
+            PRIMARY KEY (exp_id, phase_id, param_id)
+        ) WITHOUT ROWID
+    """)
+    conn.execute(STATS_TRIGGER)
+    _refresh_stats(conn, [r[0] for r in conn.execute("SELECT DISTINCT exp_id FROM measurements")])
+    conn.commit()
+    conn.close()
+
+
+def _create_import_files_index():
+    """import_files rows of an experiment by exp_id (delete_experiment)."""
+    conn = get_conn()
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_import_files_exp ON import_files(exp_id)")
+    conn.commit()
+    conn.close()
+
+
+# Append only: a database at user_version n has had MIGRATIONS[:n] applied. The first ones
+# are idempotent, so databases created before versioning (user_version 0) go through all of them.
+MIGRATIONS = (
+    _create_tables,                     # 1: base tables
+    _migrate_measurements_normalized,   # 2: wide measurements -> parameters / experiment_days / facts
+    _create_views_and_indexes,          # 3: measurements_wide view, indexes
+    create_default_phases,              # 4: vr_blend + temps -> one Default phase per experiment
+    _create_experiment_matrices,        # 5: days x parameters matrix per experiment
+    _create_measurement_stats,          # 6: per experiment / phase / parameter aggregates
+    _create_import_files_index,         # 7: import_files by experiment
+)
+
+
+def migrate_schema():
+    """Apply the migrations this database file has not seen yet. Returns (old_version, new_version)."""
+    conn = get_conn()
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
     conn.close()
+    for n, migration in enumerate(MIGRATIONS[version:], version + 1):
+        migration()
+        conn = get_conn()
+        conn.execute(f"PRAGMA user_version={n}")
+        conn.commit()
+        conn.close()
+    return version, max(version, len(MIGRATIONS))
@@ -2,9 +2,18 @@
 Excel -> SQLite extractor for MEBU Master Template and Product sheets.
 Header-aware extraction handles variable column ranges across files.
 """
+import hashlib
+import time
+import numpy as np
 import pandas as pd
+from contextlib import contextmanager, nullcontext
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
 
+import openpyxl
+from openpyxl.cell.cell import ERROR_CODES
+
 # ── Column Helpers ────────────────────────────────────────────────────────────
 
 def excel_col_to_idx(col_str):
@@ -27,18 +36,10 @@ def _safe_float(val):
     except (ValueError, TypeError):
         return None
 
-def _safe_date(val):
-    try:
-        if pd.isna(val): return ""
-        d = pd.to_datetime(val, errors="coerce")
-        if pd.isna(d): return ""
-        return d.strftime("%d-%b-%y")
-    except:
-        return ""
-
-def _matches_any(cell_val, search_strings):
-    n = _norm(cell_val)
-    return any(_norm(s) in n for s in search_strings)
+def _format_dates(values):
+    """Batch version of the per-cell date formatting: one pd.to_datetime call per row."""
+    dates = pd.to_datetime(pd.Series(values, dtype=object), errors="coerce", format="mixed")
+    return dates.dt.strftime("%d-%b-%y").fillna("").to_numpy(dtype=object)
 
 # ── Parameter catalogues ──────────────────────────────────────────────────────
 
@@ -140,33 +141,115 @@ LOW_GAS_CATALOGUE = {
     "LG_N2":  (["N2"], "Low Gas", "mol%", None, None, None),
 }
 
+# Gas blocks on the HPS DAILY sheet: (layout key, header marker, category, catalogue).
+# Parameter labels are searched in column 3 within GAS_WINDOW rows of the block header.
+GAS_SECTIONS = (
+    ("high_gas", "high gas", "High Gas", HIGH_GAS_CATALOGUE),
+    ("low_gas",  "low gas",  "Low Gas",  LOW_GAS_CATALOGUE),
+)
+GAS_WINDOW = 15
+
 # ── Extraction Logic ──────────────────────────────────────────────────────────
 
+_END = object()
+
+class _PatternTrie:
+    """Multi-pattern substring matcher: reports every pattern occurring in a label,
+    including patterns that overlap or are prefixes of each other."""
+    def __init__(self, patterns):
+        self.root = {}
+        for p in patterns:
+            node = self.root
+            for ch in p:
+                node = node.setdefault(ch, {})
+            node[_END] = p
+
+    def find_all(self, text):
+        hits = set()
+        if _END in self.root: hits.add(self.root[_END])
+        for i in range(len(text)):
+            node = self.root
+            for ch in text[i:]:
+                node = node.get(ch)
+                if node is None: break
+                if _END in node: hits.add(node[_END])
+        return hits
+
+@lru_cache(maxsize=64)
+def _trie_for(patterns):
+    return _PatternTrie(patterns)
+
+class _LabelIndex:
+    """Normalized labels of one sheet column, built once and reused for every catalogue."""
+    def __init__(self, col):
+        self.index = col.index
+        self.labels = [_norm(v) for v in col.fillna("").astype(str)]
+        self.exact = {}
+        for pos, label in enumerate(self.labels):
+            self.exact.setdefault(label, pos)
+
+    def _first_containing(self, patterns):
+        """Map each pattern to the first row position whose label contains it."""
+        trie = _trie_for(frozenset(patterns))
+        pending, first = set(patterns), {}
+        for pos, label in enumerate(self.labels):
+            for p in trie.find_all(label) & pending:
+                first[p] = pos
+                pending.discard(p)
+            if not pending: break
+        return first
+
+    def resolve(self, catalogue):
+        """Row label for each catalogue key: exact match first, then substring match."""
+        found = {}
+        for key, (searches, *_) in catalogue.items():
+            hits = [self.exact[n] for n in map(_norm, searches) if n in self.exact]
+            if hits: found[key] = self.index[min(hits)]
+        remaining = {k: [_norm(s) for s in v[0]] for k, v in catalogue.items() if k not in found}
+        if remaining:
+            first = self._first_containing({n for ns in remaining.values() for n in ns})
+            for key, ns in remaining.items():
+                hits = [first[n] for n in ns if n in first]
+                if hits: found[key] = self.index[min(hits)]
+        return found
+
 def _find_param_rows(df, catalogue, col_idx=2):
-    found = {}
-    col = df.iloc[:, col_idx].fillna("").astype(str)
-    # 1. Exact match
-    for key, (searches, *_) in catalogue.items():
-        for i, val in col.items():
-            if any(_norm(val.strip()) == _norm(s) for s in searches):
-                found[key] = i; break
-    # 2. Substring match for remaining
-    for key, (searches, *_) in catalogue.items():
-        if key in found: continue
-        for i, val in col.items():
-            if _matches_any(val, searches):
-                found[key] = i; break
-    return found
+    return _LabelIndex(df.iloc[:, col_idx]).resolve(catalogue)
 
-def _find_day_columns(df):
-    day_row_idx = op_row_idx = lab_row_idx = None
-    for r in range(min(15, len(df))):
-        row_vals = df.iloc[r].fillna("").astype(str)
-        for c, val in enumerate(row_vals):
-            v = _norm(val)
-            if day_row_idx is None and "day on stream" in v: day_row_idx = r
-            if op_row_idx is None and "pilot plant operation" in v: op_row_idx = r
-            if lab_row_idx is None and ("lab date" in v or "date" == v): lab_row_idx = r
+class DayColumns:
+    """Day-on-stream columns of a sheet as parallel arrays, sorted by day."""
+    __slots__ = ("col", "day", "op_date", "lab_date")
+
+    def __init__(self, col, day, op_date, lab_date):
+        self.col, self.day, self.op_date, self.lab_date = col, day, op_date, lab_date
+
+    def __len__(self):
+        return len(self.day)
+
+    def take(self, mask):
+        return DayColumns(self.col[mask], self.day[mask], self.op_date[mask], self.lab_date[mask])
+
+_NO_DAYS = DayColumns(np.array([], dtype=int), np.array([], dtype=int),
+                      np.array([], dtype=object), np.array([], dtype=object))
+
+def _find_header_rows(grid, n_rows=15):
+    """Locate the day / pilot-plant-operation / lab-date rows in the top block in one pass."""
+    top = grid[:n_rows]
+    if top.size == 0: return None, None, None
+    cells = pd.Series(top.ravel(), dtype=object).fillna("").astype(str)
+    cells = cells.str.strip().str.lower()
+
+    def first_row(mask):
+        rows = np.flatnonzero(mask.to_numpy().reshape(top.shape).any(axis=1))
+        return int(rows[0]) if len(rows) else None
+
+    return (first_row(cells.str.contains("day on stream", regex=False)),
+            first_row(cells.str.contains("pilot plant operation", regex=False)),
+            first_row(cells.str.contains("lab date", regex=False) | (cells == "date")))
+
+def _find_day_rows(df, grid):
+    """(day_row, op_row, lab_row) indices of the header block."""
+    day_row_idx, op_row_idx, lab_row_idx = _find_header_rows(grid)
 
     if day_row_idx is None:
         for r in range(min(15, len(df))):
@@ -174,119 +257,446 @@ def _find_day_columns(df):
             nums = [idx for idx, x in enumerate(row) if isinstance(x, (int, float)) and 0 < x < 100]
             if len(nums) > 5:
                 day_row_idx = r; break
+    return day_row_idx, op_row_idx, lab_row_idx
 
-    if day_row_idx is None: return []
-    day_row = df.iloc[day_row_idx]
-    op_row = df.iloc[op_row_idx] if op_row_idx is not None else None
-    lab_row = df.iloc[lab_row_idx] if lab_row_idx is not None else None
+def _day_columns_at(grid, day_row_idx, op_row_idx, lab_row_idx):
+    if day_row_idx is None: return _NO_DAYS
+    raw = _float_grid(grid[day_row_idx])
+    with np.errstate(invalid="ignore"):
+        days = np.trunc(raw)
+        valid = np.flatnonzero((days >= 1) & (days <= 100))
+    # First column per day, ordered by day
+    day_vals, first = np.unique(days[valid].astype(int), return_index=True)
+    cols = valid[first]
 
-    results = []
-    for col_idx in range(len(day_row)):
-        try:
-            val = day_row.iloc[col_idx]
-            if pd.isna(val): continue
-            day = int(float(val))
-            if day < 1 or day > 100: continue
-            results.append({
-                "col": col_idx, "day": day,
-                "op_date": _safe_date(op_row.iloc[col_idx]) if (op_row is not None and col_idx < len(op_row)) else "",
-                "lab_date": _safe_date(lab_row.iloc[col_idx]) if (lab_row is not None and col_idx < len(lab_row)) else "",
-            })
-        except: continue
-
-    seen, unique = set(), []
-    for r in results:
-        if r["day"] not in seen:
-            seen.add(r["day"]); unique.append(r)
-    return sorted(unique, key=lambda x: x["day"])
+    def dates(row_idx):
+        if row_idx is None: return np.full(len(cols), "", dtype=object)
+        return _format_dates(grid[row_idx, cols])
 
-def _extract_sheet_data(df, catalogue, day_cols, exp_id):
-    param_rows = {}
+    return DayColumns(cols, day_vals, dates(op_row_idx), dates(lab_row_idx))
+
+def _find_day_columns(df):
+    grid = df.to_numpy()
+    return _day_columns_at(grid, *_find_day_rows(df, grid))
+
+def _find_catalogue_rows(df, catalogue):
+    """{key: (row, label_col)}, searching label columns 2, 3, 4 in that order."""
+    found = {}
     for c in [2, 3, 4]:
-        remaining = {k: v for k, v in catalogue.items() if k not in param_rows}
+        remaining = {k: v for k, v in catalogue.items() if k not in found}
         if not remaining: break
-        found = _find_param_rows(df, remaining, col_idx=c)
-        param_rows.update(found)
+        for key, row in _find_param_rows(df, remaining, col_idx=c).items():
+            found[key] = (int(row), c)
+    return found
 
-    records = []
-    for key, row_idx in param_rows.items():
+def _extract_sheet_data(df, catalogue, day_cols, exp_id):
+    param_rows = {k: row for k, (row, _) in _find_catalogue_rows(df, catalogue).items()}
+    return _extract_values(df, param_rows, catalogue, day_cols, exp_id).to_records()
+
+def _find_gas_anchors(grid, n_cols=11):
+    """Header row of every GAS_SECTIONS block, from one search over the leading columns.
+    Like a top-down scan that stops once every marker has been seen, each block takes the
+    last row carrying its marker up to that point (the whole sheet if a marker is missing)."""
+    lead = grid[:, :n_cols]
+    if not lead.size: return {tag: None for tag, *_ in GAS_SECTIONS}
+    cells = pd.Series(lead.ravel(), dtype=object).fillna("").astype(str).str.lower()
+    hits = {tag: np.flatnonzero(cells.str.contains(marker, regex=False).to_numpy()
+                                .reshape(lead.shape).any(axis=1))
+            for tag, marker, *_ in GAS_SECTIONS}
+    stop = max(h[0] for h in hits.values()) if all(len(h) for h in hits.values()) else len(grid)
+    anchors = {}
+    for tag, h in hits.items():
+        upto = h[h <= stop]
+        anchors[tag] = int(upto[-1]) if len(upto) else None
+    return anchors
+
+def _find_gas_sections(df):
+    """Gas blocks as {tag: {"header": row, "rows": {key: row}}} (None if absent). Each catalogue
+    is resolved in its own slice: GAS_WINDOW rows from its header, cut at the next block's header."""
+    anchors = _find_gas_anchors(df.to_numpy())
+    starts = sorted(r for r in anchors.values() if r is not None)
+    sections = {}
+    for tag, _, _, catalogue in GAS_SECTIONS:
+        header = anchors[tag]
+        if header is None:
+            sections[tag] = None
+            continue
+        end = min([header + GAS_WINDOW] + [r for r in starts if r > header])
+        rows = _find_param_rows(df.iloc[header:end], catalogue, col_idx=3)
+        sections[tag] = {"header": header, "rows": {k: int(r) for k, r in rows.items()}}
+    return sections
+
+def _float_grid(cells):
+    """Object cell block -> float array, NaN wherever _safe_float would give None."""
+    try:
+        return cells.astype(float)
+    except (ValueError, TypeError):
+        out = np.full(cells.shape, np.nan)
+        for idx, v in np.ndenumerate(cells):
+            f = _safe_float(v)
+            if f is not None: out[idx] = f
+        return out
+
+class RecordBatch:
+    """Columnar record set: parallel per-record arrays plus small lookup tables.
+
+    day, value  per-record arrays
+    param       per-record code into params, a list of (parameter, category, unit, art_low, art_high)
+    date        per-record code into dates, a list of (op_date, lab_date)
+    """
+    COLUMNS = ("exp_id", "day", "op_date", "lab_date", "category", "parameter",
+               "unit", "value", "art_low", "art_high", "within_spec")
+    __slots__ = ("exp_id", "day", "param", "date", "value", "params", "dates")
+
+    def __init__(self, exp_id, day=None, param=None, date=None, value=None, params=None, dates=None):
+        self.exp_id = exp_id
+        self.day = np.array([], dtype=int) if day is None else day
+        self.param = np.array([], dtype=int) if param is None else param
+        self.date = np.array([], dtype=int) if date is None else date
+        self.value = np.array([], dtype=float) if value is None else value
+        self.params, self.dates = params or [], dates or []
+
+    def __len__(self):
+        return len(self.day)
+
+    @classmethod
+    def concat(cls, exp_id, batches):
+        """One batch from many, merging their lookup tables."""
+        params, dates, parts = {}, {}, []
+        for b in batches:
+            if not len(b): continue
+            pmap = np.array([params.setdefault(p, len(params)) for p in b.params], dtype=int)
+            dmap = np.array([dates.setdefault(d, len(dates)) for d in b.dates], dtype=int)
+            parts.append((b.day, pmap[b.param], dmap[b.date], b.value))
+        if not parts:
+            return cls(exp_id)
+        day, param, date, value = (np.concatenate(col) for col in zip(*parts))
+        return cls(exp_id, day, param, date, value, list(params), list(dates))
+
+    def rows(self, with_exp_id=True):
+        """Yield one tuple per record in COLUMNS order (exp_id dropped if with_exp_id is False)."""
+        head = (self.exp_id,) if with_exp_id else ()
+        params, dates = self.params, self.dates
+        for d, p, t, v in zip(self.day.tolist(), self.param.tolist(), self.date.tolist(), self.value.tolist()):
+            key, category, unit, art_low, art_high = params[p]
+            op_date, lab_date = dates[t]
+            yield (*head, d, op_date, lab_date, category, key, unit, v, art_low, art_high, "N/A")
+
+    def iter_dicts(self):
+        for row in self.rows():
+            yield dict(zip(self.COLUMNS, row))
+
+    def to_records(self):
+        return list(self.iter_dicts())
+
+def _extract_values(df, param_rows, catalogue, day_cols, exp_id):
+    """Slice matched rows x day columns as one float block and keep the surviving cells as a RecordBatch."""
+    if not param_rows or not len(day_cols): return RecordBatch(exp_id)
+    keys = list(param_rows)
+    cols = day_cols.col
+    values = _float_grid(df.to_numpy()[np.ix_([param_rows[k] for k in keys], cols)])
+
+    keep = ~np.isnan(values)
+    for i, key in enumerate(keys):
         info = catalogue[key]
         fixed = info[5] if len(info) > 5 else None
-        target_cols = day_cols
-        if fixed: target_cols = [dc for dc in day_cols if fixed[0] <= dc["col"] <= fixed[1]]
-
-        for dc in target_cols:
-            val = _safe_float(df.iloc[row_idx, dc["col"]])
-            if val is None: continue
-            if val == 0.0 and info[1] not in ("High Gas", "Low Gas"): continue
-            records.append({
-                "exp_id":      exp_id, "day": dc["day"], "op_date": dc["op_date"], "lab_date": dc["lab_date"],
-                "category":    info[1], "parameter": key, "unit": info[2], "value": round(val, 5),
-                "art_low": info[3], "art_high": info[4], "within_spec": "N/A"
-            })
-    return records
-
-def extract_from_file(file_path, exp_id, exp_name=""):
-    all_records = []
-    # 1. Master Template
-    try:
-        df = pd.read_excel(str(file_path), sheet_name="Master Template", header=None)
-        all_records.extend(_extract_sheet_data(df, {**PARAM_CATALOGUE, **CONVERSION_PARAMS}, _find_day_columns(df), exp_id))
-    except: pass
+        if fixed: keep[i] &= (cols >= fixed[0]) & (cols <= fixed[1])
+        if info[1] not in ("High Gas", "Low Gas"): keep[i] &= values[i] != 0.0
+
+    i, j = np.nonzero(keep)
+    return RecordBatch(
+        exp_id,
+        day=day_cols.day[j], param=i, date=j,
+        value=np.array([round(v, 5) for v in values[i, j].tolist()], dtype=float),
+        params=[(k, *catalogue[k][1:5]) for k in keys],
+        dates=list(zip(day_cols.op_date.tolist(), day_cols.lab_date.tolist())),
+    )
+
+SHEET_CATALOGUES = {
+    "Master Template": {**PARAM_CATALOGUE, **CONVERSION_PARAMS},
+    "HPS DAILY":       HPS_CATALOGUE,
+    "LTO DAILY":       LTO_CATALOGUE,
+    "ISV":             ISV_CATALOGUE,
+}
+SHEET_NAMES = tuple(SHEET_CATALOGUES)
+GAS_SHEET = "HPS DAILY"
+BACKENDS = ("pandas", "openpyxl")
+# Bump when extraction logic changes so cached record sets are not reused.
+EXTRACTOR_VERSION = 3
 
-    # 2. HPS DAILY (HPS + Gas)
-    try:
-        df = pd.read_excel(str(file_path), sheet_name="HPS DAILY", header=None)
-        days = _find_day_columns(df)
-        if days:
-            all_records.extend(_extract_sheet_data(df, HPS_CATALOGUE, days, exp_id))
-            
-            # Find Gas sections
-            hg_header_idx = lg_header_idx = None
-            for r in range(len(df)):
-                row_vals = df.iloc[r, 0:11].fillna("").astype(str)
-                for val in row_vals:
-                    v = val.lower()
-                    if "high gas" in v: hg_header_idx = r
-                    if "low gas" in v: lg_header_idx = r
-                if hg_header_idx is not None and lg_header_idx is not None: break
-
-            if hg_header_idx is not None:
-                hg_rows = _find_param_rows(df.iloc[hg_header_idx:hg_header_idx+15], HIGH_GAS_CATALOGUE, col_idx=3)
-                for k, abs_r_idx in hg_rows.items():
-                    for dc in days:
-                        val = _safe_float(df.iloc[abs_r_idx, dc["col"]])
-                        if val is not None:
-                            all_records.append({
-                                "exp_id": exp_id, "day": dc["day"], "op_date": dc["op_date"], "lab_date": dc["lab_date"],
-                                "category": "High Gas", "parameter": k, "unit": "mol%", "value": round(val, 5),
-                                "art_low": None, "art_high": None, "within_spec": "N/A"
-                            })
-
-            if lg_header_idx is not None:
-                lg_rows = _find_param_rows(df.iloc[lg_header_idx:lg_header_idx+15], LOW_GAS_CATALOGUE, col_idx=3)
-                for k, abs_r_idx in lg_rows.items():
-                    for dc in days:
-                        val = _safe_float(df.iloc[abs_r_idx, dc["col"]])
-                        if val is not None:
-                            all_records.append({
-                                "exp_id": exp_id, "day": dc["day"], "op_date": dc["op_date"], "lab_date": dc["lab_date"],
-                                "category": "Low Gas", "parameter": k, "unit": "mol%", "value": round(val, 5),
-                                "art_low": None, "art_high": None, "within_spec": "N/A"
-                            })
+# ── Profiling ─────────────────────────────────────────────────────────────────
 
-    except: pass
+WORKBOOK = "(workbook)"   # pseudo-sheet for stages that are not tied to one sheet
+
+class ExtractProfile:
+    """Wall time per (sheet, stage) and records emitted per (sheet, catalogue).
+
+    Stages: open (zip/XML open), read (sheet parse), fingerprint (layout cache lookup
+    and spot checks), headers (day/date rows), labels (parameter rows), gas (gas
+    sections), values (value extraction); the importer adds cache and insert.
+    Profiles are plain data, so worker processes can return them and callers can merge them.
+    """
+
+    def __init__(self):
+        self.seconds = {}
+        self.records = {}
+        self.files = 0
 
-    # 3. LTO DAILY
+    @contextmanager
+    def stage(self, sheet, stage):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(sheet, stage, time.perf_counter() - t0)
+
+    def add_time(self, sheet, stage, seconds):
+        self.seconds[(sheet, stage)] = self.seconds.get((sheet, stage), 0.0) + seconds
+
+    def add_records(self, sheet, catalogue, n):
+        self.records[(sheet, catalogue)] = self.records.get((sheet, catalogue), 0) + n
+
+    def merge(self, other):
+        for (sheet, stage), sec in other.seconds.items(): self.add_time(sheet, stage, sec)
+        for (sheet, cat), n in other.records.items(): self.add_records(sheet, cat, n)
+        self.files += other.files
+        return self
+
+    def stage_totals(self):
+        totals = {}
+        for (_, stage), sec in self.seconds.items():
+            totals[stage] = totals.get(stage, 0.0) + sec
+        return dict(sorted(totals.items(), key=lambda kv: -kv[1]))
+
+    def stage_rows(self):
+        return [{"sheet": sheet, "stage": stage, "seconds": round(sec, 4)}
+                for (sheet, stage), sec in self.seconds.items()]
+
+    def record_rows(self):
+        return [{"sheet": sheet, "catalogue": cat, "records": n}
+                for (sheet, cat), n in self.records.items()]
+
+def _stage(profile, sheet, stage):
+    return profile.stage(sheet, stage) if profile is not None else nullcontext()
+
+def _read_sheets(file_path, sheet_names=SHEET_NAMES, profile=None):
+    """Open the workbook once and return {sheet_name: DataFrame} for the sheets present."""
+    sheets = {}
     try:
-        df = pd.read_excel(str(file_path), sheet_name="LTO DAILY", header=None)
-        all_records.extend(_extract_sheet_data(df, LTO_CATALOGUE, _find_day_columns(df), exp_id))
+        with _stage(profile, WORKBOOK, "open"):
+            xls = pd.ExcelFile(str(file_path))
+        with xls:
+            for name in sheet_names:
+                if name not in xls.sheet_names: continue
+                try:
+                    with _stage(profile, name, "read"):
+                        sheets[name] = xls.parse(name, header=None)
+                except: pass
     except: pass
+    return sheets
+
+# ── Layout cache ──────────────────────────────────────────────────────────────
+
+def layout_fingerprint(name, df):
+    """Hash that identifies a template layout: the header block (A-E of the first 15 rows), the
+    sheet shape and the number of filled cells in the label columns (C-E). Cheap next to
+    discovery; labels moved within the same shape are caught by _layout_still_valid."""
+    grid = df.iloc[:, :5].to_numpy()
+    h = hashlib.sha1(f"{name}|{EXTRACTOR_VERSION}|{df.shape}|".encode())
+    h.update("\x1f".join("" if v is None or v != v else str(v) for v in grid[:15].ravel()).encode())
+    h.update(str((~pd.isna(grid[:, 2:])).sum(axis=0).tolist()).encode())
+    return h.hexdigest()
+
+def _discover_layout(name, df, profile=None):
+    with _stage(profile, name, "headers"):
+        day_row, op_row, lab_row = _find_day_rows(df, df.to_numpy())
+    with _stage(profile, name, "labels"):
+        params = _find_catalogue_rows(df, SHEET_CATALOGUES[name])
+    layout = {
+        "sheet_name": name,
+        "day_row": day_row, "op_row": op_row, "lab_row": lab_row,
+        "params": {k: list(v) for k, v in params.items()},
+    }
+    if name == GAS_SHEET:
+        with _stage(profile, name, "gas"):
+            layout.update(_find_gas_sections(df))
+    return layout
+
+def _label_matches(df, row, col, searches):
+    if row >= len(df) or col >= df.shape[1]: return False
+    label = _norm("" if pd.isna(df.iat[row, col]) else df.iat[row, col])
+    return any(_norm(s) == label or _norm(s) in label for s in searches)
+
+def _layout_still_valid(name, df, layout):
+    """Spot-check a cached layout: every cached label row still carries its label and the
+    gas headers are still in place."""
+    catalogue = SHEET_CATALOGUES[name]
+    for key, (row, col) in layout["params"].items():
+        if key not in catalogue or not _label_matches(df, row, col, catalogue[key][0]):
+            return False
+    for tag, marker, _, catalogue in GAS_SECTIONS:
+        section = layout.get(tag)
+        if not section: continue
+        header = section["header"]
+        if header >= len(df): return False
+        if not any(marker in str(v).lower() for v in df.iloc[header, 0:11] if not pd.isna(v)):
+            return False
+        for key, row in section["rows"].items():
+            if not _label_matches(df, row, 3, catalogue[key][0]): return False
+    day_row = layout["day_row"]
+    return day_row is None or day_row < len(df)
+
+def _sheet_layout(name, df, layouts=None, profile=None):
+    """Resolved layout of a sheet: from the layout cache when the fingerprint is known and
+    passes the spot checks, otherwise by full discovery (stored back into the cache)."""
+    if layouts is None:
+        return _discover_layout(name, df, profile)
+    with _stage(profile, name, "fingerprint"):
+        fp = layout_fingerprint(name, df)
+        layout = layouts.get(fp)
+        valid = layout is not None and _layout_still_valid(name, df, layout)
+    if valid:
+        return layout
+    layout = _discover_layout(name, df, profile)
+    layouts[fp] = layout
+    return layout
+
+def _sheet_records(name, df, exp_id, days_after=None, layouts=None, profile=None):
+    """All records of one sheet grid as a RecordBatch. Failures inside a sheet keep whatever was
+    extracted before them.
+    days_after: only extract day columns with day > days_after (incremental import).
+    layouts: optional layout cache (dict-like: get / __setitem__ keyed by layout_fingerprint).
+    profile: optional ExtractProfile collecting stage timings and record counts."""
+    batches = []
+
+    def emit(label, param_rows, catalogue, days):
+        with _stage(profile, name, "values"):
+            found = _extract_values(df, param_rows, catalogue, days, exp_id)
+        if profile is not None: profile.add_records(name, label, len(found))
+        batches.append(found)
 
-    # 4. ISV
     try:
-        df = pd.read_excel(str(file_path), sheet_name="ISV", header=None)
-        all_records.extend(_extract_sheet_data(df, ISV_CATALOGUE, _find_day_columns(df), exp_id))
+        layout = _sheet_layout(name, df, layouts, profile)
+        with _stage(profile, name, "headers"):
+            days = _day_columns_at(df.to_numpy(), layout["day_row"], layout["op_row"], layout["lab_row"])
+            if days_after is not None: days = days.take(days.day > days_after)
+        param_rows = {k: row for k, (row, _) in layout["params"].items()}
+        if name != GAS_SHEET:
+            emit(name, param_rows, SHEET_CATALOGUES[name], days)
+        elif len(days):
+            emit(name, param_rows, SHEET_CATALOGUES[name], days)
+            for tag, _, label, gas_catalogue in GAS_SECTIONS:
+                section = layout.get(tag)
+                if section:
+                    emit(label, section["rows"], gas_catalogue, days)
     except: pass
-
+    return RecordBatch.concat(exp_id, batches)
+
+# ── Streaming backend (openpyxl read-only) ────────────────────────────────────
+
+def _clean_cell(v):
+    # pandas turns Excel error cells into NaN; read-only values_only hands back the error text
+    return None if isinstance(v, str) and v in ERROR_CODES else v
+
+def _gas_hits(row):
+    """Tags of the GAS_SECTIONS markers present in the leading cells of one row."""
+    cells = [str(v).lower() for v in row[:11] if v is not None]
+    return [tag for tag, marker, *_ in GAS_SECTIONS if any(marker in v for v in cells)]
+
+def _stream_sheet(ws, catalogue, gas=False):
+    """Read one worksheet row by row into a bounded DataFrame.
+
+    Columns past the last day-on-stream column are dropped as each row is read. Reading
+    stops early only once no later row can change the label resolution of _find_catalogue_rows:
+    every catalogue key has an exact hit in column 2 (the column it prefers, where an exact hit
+    also beats any substring hit) and, on the gas sheet, every gas section plus its GAS_WINDOW
+    rows has been read. Otherwise the whole sheet is read.
+    """
+    ws.reset_dimensions()
+    rows = ws.iter_rows(values_only=True)
+    kept = [tuple(_clean_cell(v) for v in row) for row in islice(rows, 15)]
+    days = _find_day_columns(pd.DataFrame(kept))
+    if not len(days):
+        return pd.DataFrame(kept)
+    width = max(11, int(days.col.max()) + 1)
+    kept = [row[:width] for row in kept]
+
+    wanted = {}
+    for key, (searches, *_) in catalogue.items():
+        for n in map(_norm, searches):
+            wanted.setdefault(n, set()).add(key)
+    pending = set(catalogue)
+    first_hit = {}
+
+    def settle(r, row):
+        if len(row) > 2 and row[2] is not None:
+            pending.difference_update(wanted.get(_norm(row[2]), ()))
+        if gas:
+            for tag in _gas_hits(row): first_hit.setdefault(tag, r)
+
+    for r, row in enumerate(kept):
+        settle(r, row)
+    for r, row in enumerate(rows, start=len(kept)):
+        row = tuple(_clean_cell(v) for v in row[:width])
+        kept.append(row)
+        settle(r, row)
+        if pending: continue
+        if not gas or (len(first_hit) == len(GAS_SECTIONS)
+                       and r >= max(first_hit.values()) + GAS_WINDOW - 1):
+            break
+    return pd.DataFrame(kept)
+
+def _iter_streaming(file_path, exp_id, days_after=None, layouts=None, profile=None):
+    try:
+        with _stage(profile, WORKBOOK, "open"):
+            wb = openpyxl.load_workbook(str(file_path), read_only=True, data_only=True, keep_links=False)
+    except Exception:
+        return
+    try:
+        for name in SHEET_NAMES:
+            if name not in wb.sheetnames: continue
+            try:
+                with _stage(profile, name, "read"):
+                    df = _stream_sheet(wb[name], SHEET_CATALOGUES[name], gas=(name == GAS_SHEET))
+            except Exception:
+                continue
+            yield _sheet_records(name, df, exp_id, days_after, layouts, profile)
+    finally:
+        wb.close()
+
+def iter_batches(file_path, exp_id, backend="openpyxl", days_after=None, layouts=None, profile=None):
+    """Yield one RecordBatch per sheet.
+
+    backend="openpyxl" streams each sheet in read-only mode with bounded memory;
+    backend="pandas" parses full sheet grids with pd.ExcelFile (reference path).
+    days_after: restrict extraction to days on stream after this day.
+    layouts: optional layout cache so known templates skip label/header discovery.
+    profile: optional ExtractProfile filled with per-sheet, per-stage timings.
+    """
+    if backend == "openpyxl":
+        yield from _iter_streaming(file_path, exp_id, days_after, layouts, profile)
+    elif backend == "pandas":
+        sheets = _read_sheets(file_path, profile=profile)
+        for name in SHEET_NAMES:
+            if name in sheets:
+                yield _sheet_records(name, sheets[name], exp_id, days_after, layouts, profile)
+    else:
+        raise ValueError(f"Unknown extractor backend: {backend!r} (expected one of {BACKENDS})")
+
+def iter_records(file_path, exp_id, backend="openpyxl", days_after=None, layouts=None, profile=None):
+    """Yield measurement record dicts sheet by sheet (see iter_batches for the arguments)."""
+    for batch in iter_batches(file_path, exp_id, backend, days_after, layouts, profile):
+        yield from batch.iter_dicts()
+
+def extract_from_file(file_path, exp_id, exp_name="", backend="openpyxl", days_after=None, layouts=None,
+                      profile=None, columnar=False):
+    """Returns (records, error). columnar=True returns one RecordBatch instead of a list of dicts."""
+    if profile is not None: profile.files += 1
+    if columnar:
+        batch = RecordBatch.concat(exp_id, iter_batches(file_path, exp_id, backend=backend,
+                                                        days_after=days_after, layouts=layouts,
+                                                        profile=profile))
+        return batch, None if len(batch) else "No data found."
+    all_records = list(iter_records(file_path, exp_id, backend=backend, days_after=days_after,
+                                    layouts=layouts, profile=profile))
     return all_records, None if all_records else "No data found."
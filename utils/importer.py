@@ -0,0 +1,338 @@
+"""
+Bulk import of the EXPERIMENT DATA folder into SQLite.
+Extraction runs on a process pool; a single writer in the calling process
+owns every database write. Unchanged workbooks are detected by size, mtime
+and SHA-256 and never re-parsed.
+"""
+import csv
+import hashlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from utils.db import (upsert_experiment, update_experiment_meta, find_experiment,
+                      insert_measurements, get_experiment,
+                      get_import_file, get_all_import_files, record_import_file,
+                      get_cached_records, put_cached_records,
+                      get_category_last_days, get_day_values, update_measurement_values, rebuild_matrices,
+                      create_default_phases,
+                      SheetLayoutStore, get_all_sheet_layouts, save_sheet_layouts)
+from utils.extractor import (extract_from_file, ExtractProfile, RecordBatch, EXTRACTOR_VERSION, SHEET_CATALOGUES,
+                             GAS_SECTIONS)
+
+DATA_DIR = Path(__file__).parent.parent / "EXPERIMENT DATA"
+MANIFEST_NAME = "manifest.csv"
+
+STATUS_NEW = "new"
+STATUS_CHANGED = "changed"
+STATUS_UP_TO_DATE = "up to date"
+
+DATABASE = "(database)"   # profile pseudo-sheet for cache lookups and inserts
+
+# ── Manifest ──────────────────────────────────────────────────────────────────
+
+def _parse_float(val):
+    try:
+        return float(val) if str(val).strip() else None
+    except (ValueError, TypeError):
+        return None
+
+def _parse_vr_blend(text):
+    """Parse 'Basrah Heavy 55% | Arab Medium 10%' (the Settings CSV export format)."""
+    blend = []
+    for part in (text or "").split("|"):
+        part = part.strip()
+        if not part: continue
+        name, _, pct = part.rpartition(" ")
+        pct_val = _parse_float(pct.rstrip("%"))
+        if name and pct_val is not None:
+            blend.append({"name": name.strip(), "pct": pct_val})
+    return blend
+
+def load_manifest(manifest_path=None):
+    """Read the optional manifest CSV. Returns {file_name: metadata dict}.
+    Columns: file, exp_name, exp_type, start_date, vr_blend, rx1_temp, rx2_temp, rx3_temp, notes
+    """
+    path = Path(manifest_path) if manifest_path else DATA_DIR / MANIFEST_NAME
+    if not path.exists():
+        return {}
+    manifest = {}
+    with open(path, newline="", encoding="utf-8-sig") as fh:
+        for row in csv.DictReader(fh):
+            file_name = (row.get("file") or "").strip()
+            if not file_name: continue
+            manifest[file_name] = {
+                "exp_name":   (row.get("exp_name") or "").strip(),
+                "exp_type":   (row.get("exp_type") or "").strip(),
+                "start_date": (row.get("start_date") or "").strip(),
+                "vr_blend":   _parse_vr_blend(row.get("vr_blend")),
+                "rx1_temp":   _parse_float(row.get("rx1_temp")),
+                "rx2_temp":   _parse_float(row.get("rx2_temp")),
+                "rx3_temp":   _parse_float(row.get("rx3_temp")),
+                "notes":      (row.get("notes") or "").strip(),
+            }
+    return manifest
+
+# ── Change detection & extraction cache ───────────────────────────────────────
+
+def file_sha256(file_path, chunk_size=1 << 20):
+    h = hashlib.sha256()
+    with open(file_path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def extractor_key():
+    """Cache key part that changes whenever the extractor version or any catalogue changes."""
+    catalogues = repr((SHEET_CATALOGUES, GAS_SECTIONS))
+    return f"v{EXTRACTOR_VERSION}-{hashlib.sha1(catalogues.encode()).hexdigest()[:10]}"
+
+def file_status(file_path, known=None):
+    """'new', 'changed' or 'up to date' for a workbook against its last import.
+    Hashes the file only when size or mtime differ from the recorded import.
+    known: optional pre-fetched get_import_file() row ({} for none)."""
+    rec = get_import_file(file_path) if known is None else known
+    if not rec or not get_experiment(rec["exp_id"]):
+        return STATUS_NEW
+    st_ = os.stat(file_path)
+    if st_.st_size == rec["size"] and st_.st_mtime == rec["mtime"]:
+        return STATUS_UP_TO_DATE
+    if st_.st_size == rec["size"] and file_sha256(file_path) == rec["sha256"]:
+        record_import_file(file_path, rec["exp_id"], st_.st_size, st_.st_mtime, rec["sha256"])
+        return STATUS_UP_TO_DATE
+    return STATUS_CHANGED
+
+def workbook_statuses(data_dir=None):
+    """{file_name: status} for every workbook in data_dir."""
+    known = get_all_import_files()
+    return {f.name: file_status(f, known.get(str(f), {})) for f in list_workbooks(data_dir)}
+
+def _is_current(file_path, exp_id):
+    rec = get_import_file(file_path)
+    return bool(rec) and rec["exp_id"] == exp_id and file_status(file_path, rec) == STATUS_UP_TO_DATE
+
+def _write(file_path, exp_id, sha, records, cache=True):
+    """Single writer step: cache the record set, insert it, remember the file fingerprint
+    and give a new experiment its Default phase.
+    Returns the insert_measurements report."""
+    if cache and records:
+        put_cached_records(sha, extractor_key(), records)
+    report = insert_measurements(records)
+    if records:
+        st_ = os.stat(file_path)
+        record_import_file(file_path, exp_id, st_.st_size, st_.st_mtime, sha)
+        create_default_phases([exp_id])
+    return report
+
+def import_workbook(file_path, exp_id, exp_name="", backend="openpyxl", force=False):
+    """Import one workbook, skipping unchanged files and reusing cached extractions.
+
+    Returns {"source", "extracted", "inserted", "ignored", "rejected", "error", "extract_s",
+             "insert_s", "profile"}
+    where source is "skipped" (unchanged), "cache" or "extracted", rejected lists
+    (row, reason) pairs that could not be stored and profile is the ExtractProfile of this import.
+    """
+    profile = ExtractProfile()
+    result = {"source": "skipped", "extracted": 0, "inserted": 0, "ignored": 0, "rejected": [],
+              "error": None, "extract_s": 0.0, "insert_s": 0.0, "profile": profile}
+    if not force and _is_current(file_path, exp_id):
+        return result
+    t0 = time.perf_counter()
+    with profile.stage(DATABASE, "cache"):
+        sha = file_sha256(file_path)
+        records = None if force else get_cached_records(sha, extractor_key(), exp_id)
+    from_cache = records is not None
+    if not from_cache:
+        records, result["error"] = extract_from_file(file_path, exp_id=exp_id, exp_name=exp_name,
+                                                     backend=backend, layouts=SheetLayoutStore(),
+                                                     profile=profile, columnar=True)
+    result["source"] = "cache" if from_cache else "extracted"
+    result["extracted"] = len(records)
+    result["extract_s"] = round(time.perf_counter() - t0, 3)
+    t0 = time.perf_counter()
+    with profile.stage(DATABASE, "insert"):
+        result.update(_write(file_path, exp_id, sha, records, cache=not from_cache))
+    result["insert_s"] = round(time.perf_counter() - t0, 3)
+    return result
+
+def import_incremental(file_path, exp_id, exp_name="", recheck_days=3, backend="openpyxl"):
+    """Extract only the days after the last stored day, plus the last recheck_days days
+    so edits to recent values are picked up. New cells are inserted, edited cells updated.
+    The cutoff follows the category that lags most (e.g. lab results behind the operating
+    data), so no sheet loses the days it has not been imported for yet.
+
+    Returns {"last_day", "days_after", "extracted", "inserted", "ignored", "rejected", "updated",
+             "error", "extract_s", "insert_s", "profile"}
+    """
+    profile = ExtractProfile()
+    last_days = get_category_last_days(exp_id).values()
+    last_day = max(last_days, default=0)
+    days_after = max(0, min(last_days, default=0) - recheck_days)
+    t0 = time.perf_counter()
+    records, err = extract_from_file(file_path, exp_id=exp_id, exp_name=exp_name,
+                                     backend=backend, days_after=days_after,
+                                     layouts=SheetLayoutStore(), profile=profile)
+    extract_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    with profile.stage(DATABASE, "insert"):
+        stored = get_day_values(exp_id, days_after + 1)
+        new, edited = [], []
+        for r in records:
+            key = (r["day"], r["parameter"])
+            if key not in stored:
+                new.append(r)
+            elif stored[key] != r["value"]:
+                edited.append(r)
+        report = insert_measurements(new, matrices=False)
+        updated = update_measurement_values(edited, matrices=False)
+        if report["inserted"] or updated:
+            rebuild_matrices([exp_id])
+        if records:
+            st_ = os.stat(file_path)
+            record_import_file(file_path, exp_id, st_.st_size, st_.st_mtime, file_sha256(file_path))
+            create_default_phases([exp_id])
+    return {"last_day": last_day, "days_after": days_after, "extracted": len(records),
+            **report, "updated": updated, "error": err,
+            "extract_s": round(extract_s, 3), "insert_s": round(time.perf_counter() - t0, 3),
+            "profile": profile}
+
+# ── Bulk import ───────────────────────────────────────────────────────────────
+
+def list_workbooks(data_dir=None):
+    return sorted(Path(data_dir or DATA_DIR).glob("*.xlsx"))
+
+MANIFEST_META = ("exp_type", "start_date", "vr_blend", "rx1_temp", "rx2_temp", "rx3_temp", "notes")
+
+def register_workbook(file_path, meta=None):
+    """Experiment for a workbook. An existing one (find_experiment) keeps its metadata except
+    for the fields its manifest entry fills in; otherwise one is created from the manifest
+    entry (or file name). Returns (exp_id, exp_name, created)."""
+    meta = meta or {}
+    exp_id = find_experiment(file_path, meta.get("exp_name"))
+    if exp_id is not None:
+        provided = {k: meta[k] for k in MANIFEST_META if meta.get(k) not in (None, "", [])}
+        if provided:
+            update_experiment_meta(exp_id, **provided)
+        return exp_id, get_experiment(exp_id)["exp_name"], False
+    exp_name = meta.get("exp_name") or Path(file_path).stem
+    exp_id = upsert_experiment(
+        exp_name=exp_name,
+        exp_type=meta.get("exp_type", ""),
+        start_date=meta.get("start_date", ""),
+        file_path=str(file_path),
+        vr_blend=meta.get("vr_blend"),
+        rx1_temp=meta.get("rx1_temp"),
+        rx2_temp=meta.get("rx2_temp"),
+        rx3_temp=meta.get("rx3_temp"),
+        notes=meta.get("notes", ""),
+    )
+    return exp_id, exp_name, True
+
+def _extract_job(file_path, exp_id, exp_name, backend="openpyxl", layouts=None):
+    """Worker entry point: runs in a child process, touches no database.
+    Records come back as a columnar RecordBatch, which pickles far smaller than dicts.
+    layouts: snapshot of known sheet layouts; newly discovered ones are returned
+    so the writer can store them."""
+    t0 = time.perf_counter()
+    layouts = dict(layouts or {})
+    known = set(layouts)
+    profile = ExtractProfile()
+    try:
+        records, err = extract_from_file(file_path, exp_id=exp_id, exp_name=exp_name, backend=backend,
+                                         layouts=layouts, profile=profile, columnar=True)
+    except Exception as e:
+        records, err = RecordBatch(exp_id), str(e)
+    new_layouts = {fp: layout for fp, layout in layouts.items() if fp not in known}
+    return records, err, time.perf_counter() - t0, new_layouts, profile
+
+def bulk_import(data_dir=None, manifest_path=None, max_workers=None, progress=None,
+                backend="openpyxl", force=False, profile=None):
+    """Extract every workbook in data_dir in parallel and write the results.
+
+    progress: optional callback(done, total, result) called after each file is written.
+    backend: extractor backend, "openpyxl" (streaming, default) or "pandas" (fallback).
+    force: re-extract even unchanged files and ignore the extraction cache.
+    profile: optional ExtractProfile that every file's stage timings are merged into.
+    Returns one result dict per file:
+        {"file", "exp_name", "exp_id", "source", "extracted", "inserted", "ignored", "rejected",
+         "error", "extract_s", "insert_s"}
+    (exp_id is None for a workbook without data: no experiment is created for it).
+    """
+    profile = profile if profile is not None else ExtractProfile()
+    files = list_workbooks(data_dir)
+    manifest = load_manifest(manifest_path)
+    known = get_all_import_files()
+    results = []
+
+    def _done(f, exp_id, exp_name, **fields):
+        result = {"file": f.name, "exp_name": exp_name, "exp_id": exp_id, "source": "extracted",
+                  "extracted": 0, "inserted": 0, "ignored": 0, "rejected": [], "error": None,
+                  "extract_s": 0.0, "insert_s": 0.0}
+        result.update(fields)
+        results.append(result)
+        if progress:
+            progress(len(results), len(files), result)
+
+    def _register(f, meta, records):
+        """Register the experiment once the workbook turned out to hold records, and stamp them
+        with it. A workbook without data gets no experiment (and causes no write)."""
+        if not len(records):
+            return None, meta.get("exp_name") or f.stem
+        exp_id, exp_name, _ = register_workbook(f, meta)
+        if hasattr(records, "rows"):
+            records.exp_id = exp_id
+        else:
+            for r in records: r["exp_id"] = exp_id
+        return exp_id, exp_name
+
+    # Unchanged files are skipped before anything is written. Experiments are registered by
+    # the writer, after extraction; cache hits are written here without touching the pool.
+    jobs = []
+    for f in files:
+        rec = known.get(str(f), {})
+        if not force and file_status(f, rec) == STATUS_UP_TO_DATE:
+            _done(f, rec["exp_id"], get_experiment(rec["exp_id"])["exp_name"], source="skipped")
+            continue
+        meta = manifest.get(f.name, {})
+        if force:
+            jobs.append((f, meta, None))
+            continue
+        t0 = time.perf_counter()
+        with profile.stage(DATABASE, "cache"):
+            sha = file_sha256(f)
+            cached = get_cached_records(sha, extractor_key(), None)
+        if cached is None:
+            jobs.append((f, meta, sha))
+            continue
+        extract_s = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        with profile.stage(DATABASE, "insert"):
+            exp_id, exp_name = _register(f, meta, cached)
+            report = _write(f, exp_id, sha, cached, cache=False)
+        _done(f, exp_id, exp_name, source="cache", extracted=len(cached), **report,
+              extract_s=round(extract_s, 3), insert_s=round(time.perf_counter() - t0, 3))
+
+    if not jobs:
+        return results
+    workers = max_workers or min(len(jobs), os.cpu_count() or 1)
+    layouts = get_all_sheet_layouts()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(_extract_job, str(f), None, meta.get("exp_name") or f.stem, backend, layouts):
+                   (f, meta, sha) for f, meta, sha in jobs}
+        for fut in as_completed(futures):
+            f, meta, sha = futures[fut]
+            try:
+                records, err, extract_s, new_layouts, file_profile = fut.result()
+                profile.merge(file_profile)
+            except Exception as e:
+                records, err, extract_s, new_layouts = [], str(e), 0.0, {}
+            t0 = time.perf_counter()
+            with profile.stage(DATABASE, "insert"):
+                save_sheet_layouts(new_layouts)
+                exp_id, exp_name = _register(f, meta, records)
+                report = _write(f, exp_id, sha or file_sha256(f), records)
+            _done(f, exp_id, exp_name, extracted=len(records), **report, error=err,
+                  extract_s=round(extract_s, 3), insert_s=round(time.perf_counter() - t0, 3))
+    return results
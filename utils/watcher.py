@@ -0,0 +1,149 @@
+"""
+Watch-folder auto-ingest for EXPERIMENT DATA.
+Polls the data folder and imports new or changed workbooks once they have
+stopped changing, so a file still being copied is never parsed half-written.
+Every ingest is written to the ingest_log table shown on the Import page.
+
+Run standalone:  python -m utils.watcher [--interval 10] [--settle 5]
+or start in the background from launcher.py via start_watcher().
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+import zipfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.db import init_db, get_experiment, get_import_file, delete_experiment, log_ingest
+from utils.importer import (DATA_DIR, MANIFEST_NAME, STATUS_UP_TO_DATE, file_status, import_incremental,
+                            import_workbook, list_workbooks, load_manifest, register_workbook)
+
+POLL_INTERVAL = 10.0   # seconds between folder scans
+SETTLE_TIME = 5.0      # a file must keep the same size/mtime this long before it is ingested
+
+
+def _snapshot(data_dir):
+    """{path: (size, mtime)} for every workbook, skipping Excel '~$' lock files."""
+    snap = {}
+    for f in list_workbooks(data_dir):
+        if f.name.startswith("~$"): continue
+        try:
+            st_ = os.stat(f)
+        except OSError:
+            continue
+        snap[f] = (st_.st_size, st_.st_mtime)
+    return snap
+
+def _is_complete(file_path):
+    """An .xlsx is a zip archive; a partial copy has no readable central directory."""
+    try:
+        with zipfile.ZipFile(file_path) as zf:
+            return "[Content_Types].xml" in zf.namelist()
+    except (zipfile.BadZipFile, OSError):
+        return False
+
+def ingest_file(file_path, manifest=None, wait_s=0.0):
+    """Import one new or changed workbook and log the outcome.
+    Known workbooks are imported incrementally (edits to recent days are picked up); the others
+    are imported in full. A workbook without an import_files row may still belong to an experiment
+    (imported before import tracking, or on another machine): register_workbook matches it by file
+    name or experiment name and leaves its metadata alone, so only genuinely new workbooks create
+    an experiment (and none is kept for a workbook without data)."""
+    file_path = Path(file_path)
+    rec = get_import_file(file_path)
+    entry = {"file_name": file_path.name, "wait_s": round(wait_s, 3)}
+    try:
+        if rec and get_experiment(rec["exp_id"]):
+            exp_id = rec["exp_id"]
+            result = import_incremental(str(file_path), exp_id=exp_id)
+            entry.update(action="incremental", updated=result["updated"])
+        else:
+            exp_id, exp_name, created = register_workbook(file_path, (manifest or {}).get(file_path.name))
+            result = import_workbook(str(file_path), exp_id=exp_id, exp_name=exp_name)
+            if created and not result["extracted"]:
+                delete_experiment(exp_id)
+                exp_id = None
+            entry.update(action=f"full ({result['source']}{'' if created else ', existing experiment'})")
+        entry.update(exp_id=exp_id, extracted=result["extracted"], inserted=result["inserted"],
+                     error=result["error"], extract_s=result["extract_s"], insert_s=result["insert_s"])
+    except Exception as e:
+        entry.update(action="failed", error=str(e))
+    log_ingest(**entry)
+    return entry
+
+
+class FolderWatcher:
+    """Polling watcher. poll() does one scan and returns the entries ingested by it."""
+
+    def __init__(self, data_dir=None, settle=SETTLE_TIME):
+        self.data_dir = Path(data_dir or DATA_DIR)
+        self.settle = settle
+        self._pending = {}   # path -> (size, mtime, first_seen, last_change)
+        self._done = {}      # path -> (size, mtime) last handled
+
+    def poll(self):
+        now = time.monotonic()
+        snap = _snapshot(self.data_dir)
+        for f in list(self._pending):
+            if f not in snap: del self._pending[f]
+        ready = []
+        for f, sig in snap.items():
+            if self._done.get(f) == sig: continue
+            size, mtime, first_seen, last_change = self._pending.get(f, (None, None, now, now))
+            if (size, mtime) != sig:
+                self._pending[f] = (*sig, first_seen, now)
+                continue
+            if now - last_change >= self.settle and _is_complete(f):
+                ready.append((f, sig, now - first_seen))
+
+        entries = []
+        manifest = load_manifest(self.data_dir / MANIFEST_NAME) if ready else {}
+        for f, sig, waited in ready:
+            del self._pending[f]
+            self._done[f] = sig
+            if file_status(f) == STATUS_UP_TO_DATE: continue
+            entries.append(ingest_file(f, manifest, wait_s=waited))
+        return entries
+
+    def run(self, interval=POLL_INTERVAL, stop_event=None):
+        stop_event = stop_event or threading.Event()
+        while not stop_event.is_set():
+            try:
+                for e in self.poll():
+                    print(f"[watcher] {e['file_name']}: {e['action']} — {e.get('inserted', 0)} inserted"
+                          + (f" ({e['error']})" if e.get("error") else ""), flush=True)
+            except Exception as e:
+                print(f"[watcher] scan failed: {e}", flush=True)
+            stop_event.wait(interval)
+
+
+def start_watcher(data_dir=None, interval=POLL_INTERVAL, settle=SETTLE_TIME):
+    """Start the watcher on a daemon thread. Returns the stop Event."""
+    init_db()
+    stop_event = threading.Event()
+    watcher = FolderWatcher(data_dir, settle=settle)
+    threading.Thread(target=watcher.run, args=(interval, stop_event), daemon=True,
+                     name="mebu-watcher").start()
+    return stop_event
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Auto-ingest new or changed workbooks in EXPERIMENT DATA.")
+    parser.add_argument("--data-dir", default=str(DATA_DIR))
+    parser.add_argument("--interval", type=float, default=POLL_INTERVAL, help="seconds between scans")
+    parser.add_argument("--settle", type=float, default=SETTLE_TIME,
+                        help="seconds a file must stay unchanged before it is ingested")
+    args = parser.parse_args()
+    init_db()
+    print(f"[watcher] watching {args.data_dir} every {args.interval:g}s", flush=True)
+    try:
+        FolderWatcher(args.data_dir, settle=args.settle).run(args.interval)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()